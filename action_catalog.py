@@ -0,0 +1,43 @@
+import json
+import os
+from cached_store import write_json_atomic
+
+ACTION_CATALOG_PATH = "alen_rl_model.actions.json"
+MIN_ACTION_SPACE = 16
+
+
+def load_catalog(path=ACTION_CATALOG_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("actions", [])
+
+
+def build_catalog(data, existing=None):
+    # Existing indices never move; unseen actions are appended in first-seen order
+    actions = list(existing or [])
+    known = set(actions)
+    for item in data:
+        action = item["action"]
+        if action not in known:
+            known.add(action)
+            actions.append(action)
+    return actions
+
+
+def policy_size(n_actions):
+    """Policy output size for a catalog of `n_actions` replies.
+
+    Rounded up to a power of two (at least MIN_ACTION_SPACE) so a saved PPO
+    model keeps fitting while the catalog grows; once the catalog outgrows
+    it, the trainer starts a new model at the next size. Indices past the
+    catalog are never the right answer and are ignored at inference time.
+    """
+    size = MIN_ACTION_SPACE
+    while size < n_actions:
+        size *= 2
+    return size
+
+
+def save_catalog(actions, path=ACTION_CATALOG_PATH, version=None):
+    write_json_atomic(path, {"version": version, "actions": actions})
@@ -1,73 +1,61 @@
-import requests
-import asyncio
-import edge_tts
-import whisper
-import tempfile
-import sounddevice as sd
-import soundfile as sf
-import torch
-import json
+import startup
 import os
-import pyttsx3
-import speech_recognition as sr
-import webbrowser
 import subprocess
-import requests
-import pyautogui
 import ctypes
 import datetime
-import threading
-from stable_baselines3 import PPO
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from queue import Queue
-from rapidfuzz import process
+from interaction_store import default_store as interaction_store
+from model_registry import registry as model_registry
+from embedding_cache import default_cache as embedding_cache
+from memory_index import SemanticMemoryIndex
+from cached_store import get_store
+from transcriber import Transcriber
+from training_scheduler import scheduler as training_scheduler
+from fs_indexer import DirectoryIndexer, BackgroundIndex
+from name_index import NameIndex
+from search_client import default_client as search_client
+from speech_worker import SpeechWorker, PRIORITY_NORMAL
+from tracing import tracer
+from answer_pipeline import AnswerPipeline
+from connectivity import monitor as connectivity
+
+# Heavy or device-bound modules load on first use (or in warm_up)
+sd = startup.lazy_import("sounddevice")
+pyautogui = startup.lazy_import("pyautogui")
 
 PREFERENCES_FILE = "user_preferences.json"
-INTERACTIONS_FILE = "interaction_dataset.json"
 MEMORY_FILE = "memory.json"
 ALIASES_FILE = "custom_aliases.json"
 
+aliases_store = get_store(ALIASES_FILE)
+preferences_store = get_store(PREFERENCES_FILE, default=lambda: {"voice_rate": 180})
+memory_store = get_store(MEMORY_FILE)
+
 def load_aliases():
-    if os.path.exists(ALIASES_FILE):
-        with open(ALIASES_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    return aliases_store.load()
 
 def save_aliases(aliases):
-    with open(ALIASES_FILE, "w") as f:
-        json.dump(aliases, f, indent=4)
+    aliases_store.save(aliases)
 
 def apply_aliases(text):
-    aliases = load_aliases()
-    return aliases.get(text.lower().strip(), text)
+    with tracer.span("aliases"):
+        aliases = aliases_store.view()
+        return aliases.get(text.lower().strip(), text)
 
 def load_preferences():
-    if os.path.exists(PREFERENCES_FILE):
-        with open(PREFERENCES_FILE, "r") as f:
-            return json.load(f)
-    return {"voice_rate": 180}
+    return preferences_store.load()
 
 def save_preferences(prefs):
-    with open(PREFERENCES_FILE, "w") as f:
-        json.dump(prefs, f, indent=4)
-
-speech_queue = Queue()
+    preferences_store.save(prefs)
 
-def speak(text):
-    speech_queue.put(text)
-    if speech_queue.qsize() == 1:
-        threading.Thread(target=_speak_loop).start()
+speech_worker = SpeechWorker(get_rate=lambda: preferences_store.view().get("voice_rate", 180))
 
-def _speak_loop():
-    engine = pyttsx3.init()
-    prefs = load_preferences()
-    engine.setProperty('rate', prefs.get("voice_rate", 180))
+def speak(text, priority=PRIORITY_NORMAL, cache=False, interrupt=False):
+    # cache=True for fixed replies that are worth pre-rendering to audio
+    speech_worker.say(text, priority=priority, cache=cache, interrupt=interrupt)
 
-    while not speech_queue.empty():
-        text = speech_queue.get()
-        engine.say(text)
-        engine.runAndWait()
+def stop_speaking():
+    speech_worker.interrupt()
 
 def log_interaction(state, action, reward):
     interaction = {
@@ -76,48 +64,30 @@ def log_interaction(state, action, reward):
         "reward": reward,
         "timestamp": datetime.datetime.now().isoformat()
     }
-    if os.path.exists(INTERACTIONS_FILE):
-        with open(INTERACTIONS_FILE, "r") as f:
-            data = json.load(f)
-    else:
-        data = []
-
-    data.append(interaction)
-
-    with open(INTERACTIONS_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    with tracer.span("log_interaction"):
+        count = interaction_store.append(interaction)
 
-    if len(data) % 20 == 0:
-        threading.Thread(target=train_rl_model).start()
+    if count % 20 == 0:
+        train_rl_model()
 
 def train_rl_model():
-    try:
-        print("⚙ Training RL model (auto-trigger)...")
-        from trainer import train_alen_rl_model
-        train_alen_rl_model()
-        print("✅ Model trained and saved as alen_rl_model.zip")
-    except Exception as e:
-        print(f"RL training failed: {e}")
+    # Debounced, single-flight; training runs in a low-priority child process
+    training_scheduler.request()
 
 
 def predict_response_from_model(user_input):
-    model_path = "alen_rl_model.zip"
-    if not os.path.exists(model_path):
-        return None  # Model hasn't been trained yet
-
     try:
-        device = "cpu" 
-        model = PPO.load(model_path, device=device)
-        encoder = SentenceTransformer("multi-qa-MiniLM-L6-cos-v1", device=device)
-
-        state_vec = encoder.encode(user_input)
-        action_idx, _ = model.predict(np.array(state_vec), deterministic=True)
-
-        with open("interaction_dataset.json", "r") as f:
-            data = json.load(f)
-            actions = list({item["action"] for item in data})
-            if action_idx < len(actions):
-                return actions[action_idx]
+        with tracer.span("policy_snapshot"):
+            model, actions = model_registry.get_snapshot()
+        if model is None:
+            return None  # Model hasn't been trained yet
+        with tracer.span("encode"):
+            state_vec = embedding_cache.encode(user_input)
+        with tracer.span("policy_predict"):
+            action_idx, _ = model.predict(np.array(state_vec), deterministic=True)
+
+        if action_idx < len(actions):
+            return actions[int(action_idx)]
     except Exception as e:
         print(f"RL model prediction failed: {e}")
         return None
@@ -125,38 +95,28 @@ def predict_response_from_model(user_input):
     return None
 
 def load_memory():
-    if not os.path.exists(MEMORY_FILE):
-        return {}
-    with open(MEMORY_FILE, "r") as f:
-        return json.load(f)
+    return memory_store.load()
 
 def save_memory(memory):
-    with open(MEMORY_FILE, "w") as f:
-        json.dump(memory, f, indent=4)
+    memory_store.save(memory)
 
-from fuzzywuzzy import fuzz
+memory_index = SemanticMemoryIndex()
 
 def memory_response(command, threshold=85):
     command = command.strip().lower()
-    memory = load_memory()
-    best_match = None
-    best_score = 0
-
-    for key in memory.keys():
-        score = fuzz.ratio(command, key)
-        if score > best_score and score >= threshold:
-            best_score = score
-            best_match = key
-
-    if best_match:
-        return memory[best_match]
-    return None
+    stamp = memory_store.stamp()
+    if stamp != memory_index.version:
+        with tracer.span("memory_sync"):
+            # Embeddings follow in the background; exact and typo matches work right away
+            memory_index.sync(load_memory(), stamp, background=True)
+    return memory_index.lookup(command, threshold)
 
 
 def teach_memory(command, answer):
     memory = load_memory()
     memory[command.lower()] = answer
     save_memory(memory)
+    memory_index.add(command.lower(), answer, version=memory_store.stamp())
     # Save as alias if misheard/shortform
     aliases = load_aliases()
     if answer.lower() != command.lower():
@@ -167,24 +127,33 @@ def teach_memory(command, answer):
 def list_audio_devices():
     print(sd.query_devices())
 
+_transcriber = None
+
+def get_transcriber():
+    # Model size and decode options come from user_preferences.json
+    global _transcriber
+    prefs = load_preferences()
+    model_name = prefs.get("whisper_model", "small.en")
+    decode_options = prefs.get("whisper_options", {})
+    if (_transcriber is None or _transcriber.model_name != model_name
+            or _transcriber.decode_options != decode_options):
+        _transcriber = Transcriber(model_name, decode_options)
+    return _transcriber
+
 def listen():
     try:
         print("Listening...")
         duration = 3  # seconds
-        samplerate = 16000
 
         # Optional: specify device index
         device_info = sd.query_devices(kind='input')
         print(f"Using input device: {device_info['name']}")
 
-        audio = sd.rec(int(samplerate * duration), samplerate=samplerate, channels=1, dtype='float32')
-        sd.wait()
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            sf.write(f.name, audio, samplerate)
-            model = whisper.load_model("small.en")
-            result = model.transcribe(f.name)
-            return result["text"]
+        transcriber = get_transcriber()
+        text = transcriber.listen(duration)
+        timings = transcriber.last_timings
+        print(f"🎙 load {timings['load']:.2f}s, record {timings['record']:.2f}s, decode {timings['decode']:.2f}s")
+        return text
 
     except Exception as e:
         return f"Voice recognition error: {e}"
@@ -201,153 +170,157 @@ def is_admin():
 
 # === APP INDEXING CONFIG ===
 FOLDER_INDEX_FILE = "folder_index.json"
+FOLDER_INDEX_DEPTH = 2  # Levels below each base path to recurse into
+folder_index_store = get_store(FOLDER_INDEX_FILE)
+FOLDER_BASE_PATHS = [
+    os.path.expanduser("~"),                   # Home (includes Downloads, Desktop, etc.)
+    "C:\\", "D:\\", "E:\\"                     # Common root drives (customize as needed)
+]
+# Drive roots are listed one level deep only; below them are install trees, not user folders
+FOLDER_ROOT_DEPTHS = {root: 0 for root in FOLDER_BASE_PATHS if root.rstrip("\\/").endswith(":")}
+FOLDER_EXCLUDES = ["windows", "$recycle.bin", "system volume information", "appdata",
+                   "node_modules", ".*", "__pycache__", "site-packages",
+                   "program files*", "programdata", "$windows.*"]
+
+def _match_folder(name, is_dir):
+    return name.lower() if is_dir else None
+
+folder_index = BackgroundIndex(
+    DirectoryIndexer(FOLDER_BASE_PATHS, _match_folder, max_depth=FOLDER_INDEX_DEPTH,
+                     exclude=FOLDER_EXCLUDES, state_path="folder_index.state.json", first_wins=True,
+                     root_depths=FOLDER_ROOT_DEPTHS),
+    folder_index_store)
 
 def build_folder_index():
-    base_paths = [
-        os.path.expanduser("~"),                   # Home (includes Downloads, Desktop, etc.)
-        "C:\\", "D:\\", "E:\\"                     # Common root drives (customize as needed)
-    ]
-    folders = {}
-
-    for base in base_paths:
-        for root, dirs, _ in os.walk(base):
-            for folder in dirs:
-                folder_name = folder.lower()
-                folder_path = os.path.join(root, folder)
-                if folder_name not in folders:
-                    folders[folder_name] = folder_path
-            # Optional: prevent scanning too deep for performance
-            break  # Comment this if you want full recursion
-
-    with open(FOLDER_INDEX_FILE, "w") as f:
-        json.dump(folders, f, indent=4)
-    return folders
+    return folder_index.rebuild()
 
 def load_folder_index():
-    if os.path.exists(FOLDER_INDEX_FILE):
-        with open(FOLDER_INDEX_FILE, "r") as f:
-            return json.load(f)
-    return build_folder_index()
+    return folder_index.load()
 
 
 APP_INDEX_FILE = "app_index.json"
+app_index_store = get_store(APP_INDEX_FILE)
 START_MENU_PATHS = [
     r"C:\\ProgramData\\Microsoft\\Windows\\Start Menu\\Programs",
     os.path.expandvars(r"%APPDATA%\\Microsoft\\Windows\\Start Menu\\Programs")
 ]
+# Also scan common folders for .exe files
+APP_EXTRA_PATHS = [
+    os.path.expanduser("~/Desktop"),
+    r"C:\Program Files",
+    r"C:\Program Files (x86)"
+]
+APP_EXCLUDES = ["windowsapps"]
 
+def _match_app(name, is_dir):
+    if not is_dir and name.lower().endswith((".lnk", ".exe")):
+        return os.path.splitext(name)[0].lower()
+    return None
+
+app_index = BackgroundIndex(
+    DirectoryIndexer(START_MENU_PATHS + APP_EXTRA_PATHS, _match_app,
+                     exclude=APP_EXCLUDES, state_path="app_index.state.json"),
+    app_index_store)
 
 
 def build_app_index():
-    if "WindowsApps" not in root:
-        apps[app_name] = os.path.join(root, file)
-
-    apps = {}
-
-    # Include existing Start Menu logic
-    for path in START_MENU_PATHS:
-        for root, _, files in os.walk(path):
-            for file in files:
-                if file.lower().endswith(".lnk"):
-                    app_name = os.path.splitext(file)[0].lower()
-                    apps[app_name] = os.path.join(root, file)
-
-    # NEW: Also scan common folders for .exe files
-    additional_paths = [
-        os.path.expanduser("~/Desktop"),
-        r"C:\Program Files",
-        r"C:\Program Files (x86)"
-    ]
-    for base_path in additional_paths:
-        for root, _, files in os.walk(base_path):
-            for file in files:
-                if file.lower().endswith(".exe"):
-                    app_name = os.path.splitext(file)[0].lower()
-                    apps[app_name] = os.path.join(root, file)
-
-    with open(APP_INDEX_FILE, "w") as f:
-        json.dump(apps, f, indent=4)
-
-    return apps
+    return app_index.rebuild()
 
 
 def load_app_index():
-    if os.path.exists(APP_INDEX_FILE):
-        with open(APP_INDEX_FILE, "r") as f:
-            return json.load(f)
-    else:
-        return build_app_index()
+    return app_index.load()
+
+_name_indexes = {}
+
+def _get_name_index(kind, mapping):
+    # Rebuilt only when the cached store hands back a different view
+    index = _name_indexes.get(kind)
+    if index is None or index.mapping is not mapping:
+        index = NameIndex(mapping)
+        _name_indexes[kind] = index
+    return index
+
+def find_app_candidates(query, limit=5, threshold=75):
+    return _get_name_index("apps", load_app_index()).candidates(query, limit, threshold)
 
 def find_best_app_match(query, threshold=75):
-    apps = load_app_index()
-    matches = process.extract(query.lower(), apps.keys(), limit=1, score_cutoff=threshold)
-    if matches:
-        best = matches[0][0]
-        return apps[best]
-    return None
+    return _get_name_index("apps", load_app_index()).best(query, threshold)
 
-def open_app_by_name(app_name):
+# Actions are passed as zero-argument callables so a dry run never even looks up
+# Windows-only or GUI functions (os.startfile, pyautogui) on a headless machine
+def _run_os_action(action):
+    action()
+
+def _skip_os_action(action):
+    pass
+
+def open_app_by_name(app_name, act=_run_os_action):
     path = find_best_app_match(app_name)
     if path:
-        os.startfile(path)
+        act(lambda: os.startfile(path))
         return f"Opening {app_name.title()}."
     return f"Sorry, I couldn't find an app named {app_name}."
 
+def find_folder_candidates(name, limit=5, threshold=75):
+    return _get_name_index("folders", load_folder_index()).candidates(name, limit, threshold)
+
 def find_best_folder_match(name, threshold=75):
-    folders = load_folder_index()
-    matches = process.extract(name.lower(), folders.keys(), limit=1, score_cutoff=threshold)
-    if matches:
-        best_match = matches[0][0]
-        return folders[best_match]
-    return None
+    return _get_name_index("folders", load_folder_index()).best(name, threshold)
 
 # === HANDLE PC COMMANDS ===
-def handle_pc_command(command):
+def handle_pc_command(command, dry_run=False):
+    # dry_run resolves the command and returns the usual reply without touching the OS
+    act = _skip_os_action if dry_run else _run_os_action
     command = command.lower()
     if command == "update folders":
-        build_folder_index()
-        return "Folder index updated."
+        act(lambda: folder_index.refresh())
+        return "Updating folder index in the background."
 
         # Auto-folder detection
     if command.startswith("open ") or command.startswith("launch "):
         target = command.split(" ", 1)[1]
 
-        # Try folder match first
-        folder_path = find_best_folder_match(target)
-        if folder_path and os.path.isdir(folder_path):
-            os.startfile(folder_path)
+        # An exactly named folder wins; otherwise launching an app beats a fuzzy folder match
+        folders = find_folder_candidates(target, limit=1)
+        folder_path = folders[0][2] if folders and os.path.isdir(folders[0][2]) else None
+        if folder_path and (folders[0][1] == 100 or not find_best_app_match(target)):
+            act(lambda: os.startfile(folder_path))
             return f"Opening folder: {folder_path}"
 
         # Fallback to app launching
-        return open_app_by_name(target)
+        return open_app_by_name(target, act)
 
     # Auto-launch installed apps
     if command.startswith("open ") or command.startswith("launch "):
         app_name = command.split(" ", 1)[1]
-        return open_app_by_name(app_name)
+        return open_app_by_name(app_name, act)
 
     if command == "update apps":
-        build_app_index()
-        return "App index updated."
+        act(lambda: app_index.refresh())
+        return "Updating app index in the background."
+
+    if command == "profile next request":
+        tracer.profile_next()
+        return f"I'll profile the next request and save it to the {tracer.profile_dir} folder."
 
     # Keep key system commands
     if "shutdown" in command:
-        subprocess.call("shutdown /s /t 1")
+        act(lambda: subprocess.call("shutdown /s /t 1"))
         return "Shutting down the system."
     elif "restart" in command:
-        subprocess.call("shutdown /r /t 1")
+        act(lambda: subprocess.call("shutdown /r /t 1"))
         return "Restarting the system."
     elif "lock" in command:
-        os.system("rundll32.exe user32.dll,LockWorkStation")
+        act(lambda: os.system("rundll32.exe user32.dll,LockWorkStation"))
         return "Locking the system."
     elif "mute" in command:
-        pyautogui.press("volumemute")
+        act(lambda: pyautogui.press("volumemute"))
         return "Muting volume."
     elif "increase volume" in command:
-        pyautogui.press("volumeup")
+        act(lambda: pyautogui.press("volumeup"))
         return "Increasing volume."
     elif "decrease volume" in command:
-        pyautogui.press("volumedown")
+        act(lambda: pyautogui.press("volumedown"))
         return "Decreasing volume."
     elif "time" in command:
         now = datetime.datetime.now()
@@ -356,53 +329,37 @@ def handle_pc_command(command):
 
     return None
 
-# OPTIONAL: In main() or init, ensure app index is built at least once
-if not os.path.exists(APP_INDEX_FILE):
-    build_app_index()
+def warm_up(preload_models=True):
+    # Deferred init: call once the UI is up instead of doing this at import
+    if not os.path.exists(APP_INDEX_FILE):
+        app_index.refresh()
 
-if not os.path.exists(FOLDER_INDEX_FILE):
-    print("📁 Building folder index...")
-    build_folder_index()
+    if not os.path.exists(FOLDER_INDEX_FILE):
+        print("📁 Building folder index in the background...")
+        folder_index.refresh()
 
+    # Periodic metrics export is off unless ALEN_METRICS_FILE is set
+    tracer.start_exporter()
 
-# DuckDuckGo search fallback
-def trim_response(text):
-    # Split by full stops
-    sentences = text.split('.')
-    # Take first 2 non-empty sentences
-    short_sentences = [s.strip() for s in sentences if s.strip()]
-    short_text = '. '.join(short_sentences[:2])
-    return short_text + '.' if short_text else "Sorry, I couldn't find anything useful."
+    loaders = [search_client.warm_up, speech_worker.start]
+    if preload_models:
+        loaders += [lambda: memory_response(""), model_registry.get_policy]
+    return startup.warm_in_background(*loaders)
 
-def search_duckduckgo(query):
-    url = "https://api.duckduckgo.com/"
-    params = {
-        "q": query,
-        "format": "json",
-        "no_redirect": 1,
-        "no_html": 1,
-        "skip_disambig": 1
-    }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    }
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=5)  # timeout in seconds
-        data = response.json()
 
-        for key in ["Answer", "Definition", "Abstract"]:
-            if data.get(key):
-                return trim_response(data[key])
+# DuckDuckGo search fallback
+def search_duckduckgo(query):
+    return search_client.search(query)
 
-        for topic in data.get("RelatedTopics", []):
-            if isinstance(topic, dict) and "Text" in topic:
-                return trim_response(topic["Text"])
 
-        return "Sorry, I couldn't find anything useful."
-    except requests.exceptions.Timeout:
-        return "DuckDuckGo search timed out. Check your internet connection."
-    except Exception as e:
-        return f"Search error: {str(e)}"
+def build_pipeline(allow_os_actions=True, is_online=None, **kwargs):
+    """The one memory -> PC command -> search -> RL router used by every front end."""
+    if is_online is None:
+        connectivity.start()
+        is_online = connectivity.is_online
+    pc_command = handle_pc_command if allow_os_actions else lambda text: handle_pc_command(text, dry_run=True)
+    return AnswerPipeline(memory_response, pc_command, search_duckduckgo, predict_response_from_model,
+                          is_online=is_online, **kwargs)
 
     
     
@@ -410,6 +367,8 @@ def search_duckduckgo(query):
 def main():
     if not is_admin():
         print("⚠ Warning: Run this assistant as administrator to access all features (like Task Manager).")
+    warm_up()
+    pipeline = build_pipeline()
     speak("Hello, how can I help you?")
     last_command = ""
 
@@ -417,7 +376,8 @@ def main():
         input_method = input("Type '1' for text or '2' for voice: ")
 
         if input_method == '2':
-            command = listen()
+            with tracer.span("listen"):
+                command = listen()
             is_voice = True
         else:
             command = input("You: ")
@@ -429,32 +389,20 @@ def main():
         last_command = command.lower()
         print("You:", command)
 
-        memory = memory_response(command)
-        if memory:
-            print("ALEN:", memory)
-            if is_voice:
-                speak(memory)
-            continue
-
-        pc_reply = handle_pc_command(command)
-        if pc_reply:
-            print("ALEN:", pc_reply)
-            if is_voice:
-                speak(pc_reply)
-            continue
-
-        search_reply = search_duckduckgo(command)
-        print("ALEN:", search_reply)
+        with tracer.request("cli") as trace:
+            result = pipeline.answer(command)
+            trace.source = result["source"]
+        reply = result["response"]
+        print("ALEN:", reply)
         if is_voice:
-            speak(search_reply)
+            speak(reply, cache=result["source"] == "memory")
 
-        if search_reply == "Sorry, I couldn't find anything useful.":
+        if result["source"] == "none":
             user_answer = input("Can you please tell me what it means so I can remember? ")
             teach_memory(command, user_answer)
             print("Thanks! I’ll remember that.")
             if is_voice:
-                speak("Thanks! I’ll remember that.")
-
+                speak("Thanks! I’ll remember that.", cache=True)
 
 if __name__ == "__main__":
     main()
@@ -3,38 +3,87 @@ from gymnasium import spaces
 import numpy as np
 import json
 import os
-from sentence_transformers import SentenceTransformer
+from embedding_cache import default_cache
+from interaction_store import InteractionStore, INTERACTIONS_LOG_FILE
+from action_catalog import build_catalog, load_catalog, policy_size
+from compaction import load_compact, sample_weight
+
+
+class EmptyDatasetError(ValueError):
+    """Nothing in the dataset is worth training on."""
+
 
 class ALENEnv(gym.Env):
-    def __init__(self, dataset_path="interaction_dataset.json", action_space_size=10):
+    def __init__(self, dataset_path=INTERACTIONS_LOG_FILE, action_space_size=None, embedding_cache=None,
+                 precompute=False, actions=None, compact=False):
         super(ALENEnv, self).__init__()
         self.dataset_path = dataset_path
-        self.model = SentenceTransformer("multi-qa-MiniLM-L6-cos-v1")
-        self.action_space = spaces.Discrete(action_space_size)
+        self.compact = compact  # dataset_path is a compact (state, action) table
+        self.embeddings = default_cache if embedding_cache is None else embedding_cache
         self.observation_space = spaces.Box(low=-1, high=1, shape=(384,), dtype=np.float32)  # SentenceEmbedding size
         self.data = self._load_data()
+        self.weight_cdf = self._build_weights() if compact else None
         self.current_idx = 0
-        self.action_lookup = self._build_action_lookup()
+        self.action_lookup = self._build_action_lookup(actions)
+        # Sized from the catalog so every logged reply is reachable
+        self.action_space = spaces.Discrete(action_space_size or policy_size(len(self.action_lookup)))
+        self.precomputed = precompute
+        if precompute:
+            self._precompute()
 
     def _load_data(self):
-        if not self.dataset_path or not os.path.exists(self.dataset_path):
+        if not self.dataset_path:
             return []
-        with open(self.dataset_path, "r") as f:
-            return json.load(f)
+        if self.compact:
+            return load_compact(self.dataset_path)
+        if self.dataset_path.endswith(".json"):
+            # Old indent=4 array export: read it as-is
+            if not os.path.exists(self.dataset_path):
+                return []
+            with open(self.dataset_path, "r") as f:
+                return json.load(f)
+        # Training only reads the log; migrating the legacy file is the app's job
+        return InteractionStore(self.dataset_path, legacy_path=None).load()
+
+    def _build_weights(self):
+        weights = np.array([sample_weight(item) for item in self.data], dtype=np.float64)
+        if not weights.sum():
+            # Every pair is net-disliked (or there are none); imitating them would teach the wrong replies
+            raise EmptyDatasetError(f"every (state, action) pair in {self.dataset_path} is net-disliked")
+        return np.cumsum(weights)
+
+    def _sample_index(self):
+        if self.weight_cdf is None:
+            return int(self.np_random.integers(0, len(self.data)))
+        # Weighted draw: pairs seen more often (and more recently) come up more
+        idx = np.searchsorted(self.weight_cdf, self.np_random.random() * self.weight_cdf[-1], side="right")
+        return min(int(idx), len(self.data) - 1)
+
+    def _build_action_lookup(self, actions=None):
+        # Extend the published catalog so indices match the saved policy
+        if actions is None:
+            actions = build_catalog(self.data, load_catalog())
+        return {i: act for i, act in enumerate(actions)}
 
-    def _build_action_lookup(self):
-        unique_actions = list({item["action"] for item in self.data})
-        return {i: act for i, act in enumerate(unique_actions)}
+    def _precompute(self):
+        # Encode the whole dataset once; reset/step become array indexing
+        self.state_matrix = self.embeddings.encode([item["state"] for item in self.data]).astype(np.float32)
+        action_ids = {act: i for i, act in self.action_lookup.items()}
+        self.target_actions = np.array([action_ids[item["action"]] for item in self.data], dtype=np.int64)
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        self.current_idx = np.random.randint(0, len(self.data))
+        self.current_idx = self._sample_index()
+        if self.precomputed:
+            return self.state_matrix[self.current_idx].copy(), {}
         input_text = self.data[self.current_idx]["state"]
-        encoded = self.model.encode(input_text)
+        encoded = self.embeddings.encode(input_text)
         return np.array(encoded, dtype=np.float32), {}
 
 
     def step(self, action_idx):
+        if self.precomputed:
+            return self._step_precomputed(int(action_idx))
         action_text = self.action_lookup.get(action_idx, "")
         real_action = self.data[self.current_idx]["action"]
         reward = 1 if action_text == real_action else -1
@@ -43,6 +92,11 @@ class ALENEnv(gym.Env):
         truncated = False      # Not terminated early
         info = {"chosen": action_text, "correct": real_action}
 
-        state = self.model.encode(self.data[self.current_idx]["state"])
+        state = self.embeddings.encode(self.data[self.current_idx]["state"])
         return np.array(state, dtype=np.float32), reward, terminated, truncated, info
 
+    def _step_precomputed(self, action_idx):
+        target = self.target_actions[self.current_idx]
+        reward = 1 if action_idx == target else -1
+        info = {"chosen": self.action_lookup.get(action_idx, ""), "correct": self.action_lookup[target]}
+        return self.state_matrix[self.current_idx].copy(), reward, True, False, info
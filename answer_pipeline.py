@@ -0,0 +1,112 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from search_client import NO_ANSWER
+from tracing import tracer
+
+SEARCH_FAILURE_PREFIXES = ("Search error", "DuckDuckGo search timed out")
+
+
+def is_useful_answer(text):
+    return bool(text) and text != NO_ANSWER and not text.startswith(SEARCH_FAILURE_PREFIXES)
+
+
+class AnswerPipeline:
+    """Routes a message through memory -> PC command -> search -> RL model.
+
+    Search and the RL model only start once memory and the PC command
+    have missed, so known facts and commands are never sent to the web.
+    With `speculative=True` they start as soon as memory misses and run
+    alongside the command check (a command such as "shutdown" is then
+    also searched). A stage that raises is logged and skipped. Anything
+    unfinished when a higher-priority source answers, or when `deadline`
+    seconds pass, is abandoned.
+    """
+
+    def __init__(self, memory, pc_command, search, rl_model, is_online=lambda: True,
+                 deadline=6.0, max_workers=8, speculative=False):
+        self.memory = memory
+        self.pc_command = pc_command
+        self.search = search
+        self.rl_model = rl_model
+        self.is_online = is_online
+        self.deadline = deadline
+        self.speculative = speculative
+        # Own executor: asyncio.run() would otherwise wait on abandoned threads
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alen-pipeline")
+
+    def _run(self, loop, func, text, timings, name):
+        def timed():
+            start = time.perf_counter()
+            try:
+                with tracer.span(name):
+                    return func(text)
+            finally:
+                timings[name] = time.perf_counter() - start
+        # Copy the context so spans inside the stage join the caller's trace
+        context = contextvars.copy_context()
+        return loop.run_in_executor(self._executor, context.run, timed)
+
+    def _search_if_online(self, text):
+        with tracer.span("check_internet"):
+            online = self.is_online()
+        if not online:
+            return None
+        return self.search(text)
+
+    async def answer_async(self, text):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        timings = {}
+
+        def remaining():
+            return max(0.0, self.deadline - (loop.time() - started))
+
+        fallbacks = {}
+
+        def start_fallbacks():
+            if not fallbacks:
+                fallbacks["search"] = asyncio.ensure_future(
+                    self._run(loop, self._search_if_online, text, timings, "search"))
+                fallbacks["rl"] = asyncio.ensure_future(self._run(loop, self.rl_model, text, timings, "rl"))
+
+        try:
+            for name, func in (("memory", self.memory), ("command", self.pc_command)):
+                try:
+                    response = await asyncio.wait_for(self._run(loop, func, text, timings, name), remaining())
+                except asyncio.TimeoutError:
+                    response = None
+                except Exception as e:
+                    print(f"{name} source failed: {e}")
+                    response = None
+                if response:
+                    return self._result(response, name, timings, loop.time() - started)
+                if self.speculative:
+                    start_fallbacks()
+
+            start_fallbacks()
+            for name in ("search", "rl"):
+                try:
+                    response = await asyncio.wait_for(asyncio.shield(fallbacks[name]), remaining())
+                except asyncio.TimeoutError:
+                    continue
+                except Exception as e:
+                    print(f"{name} source failed: {e}")
+                    continue
+                if is_useful_answer(response):
+                    return self._result(response, name, timings, loop.time() - started)
+
+            return self._result(NO_ANSWER, "none", timings, loop.time() - started)
+        finally:
+            for task in fallbacks.values():
+                task.cancel()
+
+    def _result(self, response, source, timings, total):
+        return {"response": response, "source": source, "timings": dict(timings, total=total)}
+
+    def answer(self, text):
+        return asyncio.run(self.answer_async(text))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,110 @@
+import numpy as np
+
+BANDIT_MODEL_PATH = "alen_bandit_model.npz"
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class SoftmaxPolicy:
+    """Linear softmax policy over sentence embeddings.
+
+    `predict` mirrors stable-baselines3 (returns `(action, None)`), so the
+    registry and alen_backend can serve it in place of a PPO model.
+    """
+
+    def __init__(self, weights, bias):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self._rng = np.random.default_rng()
+
+    @property
+    def n_actions(self):
+        return self.bias.shape[0]
+
+    def action_probabilities(self, observations):
+        observations = np.atleast_2d(np.asarray(observations, dtype=np.float32))
+        return _softmax(observations @ self.weights + self.bias)
+
+    def predict(self, observation, deterministic=True):
+        observation = np.asarray(observation, dtype=np.float32)
+        single = observation.ndim == 1
+        probs = self.action_probabilities(observation)
+        if deterministic:
+            actions = probs.argmax(axis=1)
+        else:
+            # Inverse-CDF draw per row
+            draws = self._rng.random((probs.shape[0], 1))
+            actions = np.minimum((probs.cumsum(axis=1) < draws).sum(axis=1), self.n_actions - 1)
+        return (actions[0] if single else actions), None
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"])
+
+
+def fit_softmax(states, targets, n_actions, sample_weights=None, epochs=40, batch_size=256,
+                learning_rate=0.05, l2=1e-4, seed=0):
+    """Fit a reward-weighted softmax regression with minibatch Adam.
+
+    Each row says "in this state, this action was the logged reply"; rows
+    with weight 0 (e.g. disliked replies) are ignored.
+    """
+    states = np.asarray(states, dtype=np.float32)
+    targets = np.asarray(targets, dtype=np.int64)
+    weights = np.ones(len(states), dtype=np.float32) if sample_weights is None else \
+        np.asarray(sample_weights, dtype=np.float32)
+    keep = weights > 0
+    states, targets, weights = states[keep], targets[keep], weights[keep]
+    weights = weights / weights.mean() if len(weights) else weights
+
+    dim = states.shape[1]
+    params = [np.zeros((dim, n_actions), dtype=np.float32), np.zeros(n_actions, dtype=np.float32)]
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    rng = np.random.default_rng(seed)
+    step = 0
+
+    for _ in range(epochs):
+        order = rng.permutation(len(states))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            x, y, w = states[batch], targets[batch], weights[batch]
+            # Cross-entropy gradient: (softmax - onehot) scaled by the sample weight
+            grad_logits = _softmax(x @ params[0] + params[1])
+            grad_logits[np.arange(len(batch)), y] -= 1.0
+            grad_logits *= (w / len(batch))[:, None]
+            grads = [x.T @ grad_logits + l2 * params[0], grad_logits.sum(axis=0)]
+
+            step += 1
+            for p, g, m, v in zip(params, grads, moments, velocities):
+                m *= beta1
+                m += (1 - beta1) * g
+                v *= beta2
+                v += (1 - beta2) * g * g
+                m_hat = m / (1 - beta1 ** step)
+                v_hat = v / (1 - beta2 ** step)
+                p -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+    return SoftmaxPolicy(params[0], params[1])
+
+
+def accuracy(policy, states, targets, batch_size=1024):
+    """Share of rows where the policy's greedy action is the logged one."""
+    if not len(states):
+        return 0.0
+    correct = 0
+    for start in range(0, len(states), batch_size):
+        actions, _ = policy.predict(states[start:start + batch_size], deterministic=True)
+        correct += int((np.asarray(actions).reshape(-1) == targets[start:start + batch_size]).sum())
+    return correct / len(states)
@@ -0,0 +1,337 @@
+"""Replay load generator for the ALEN answer pipeline.
+
+Replays recorded `state` strings (or a synthetic corpus) through the same
+pipeline the GUI, CLI and service use, at a fixed concurrency and
+optional request rate:
+
+    python -m benchmarks.load_test --requests 2000 --concurrency 8 --rate 50
+    python -m benchmarks.load_test --synthetic 5000 --memory-size 20000 --log-interactions
+    python -m benchmarks.load_test --http   # through service.py over localhost
+
+Search goes to a local stub server, OS actions are dry-run and all files
+are written to a scratch directory (knowledge files from the current
+directory are copied in first).
+"""
+import argparse
+import datetime
+import http.client
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stubs import install_stubs, StubSearchServer
+from benchmarks.run_benchmarks import random_phrase, write_json
+from interaction_store import InteractionStore, INTERACTIONS_LOG_FILE, LEGACY_INTERACTIONS_FILE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Copied into the scratch directory when present, so replays see the real knowledge base and model
+KNOWLEDGE_FILES = ["memory.json", "custom_aliases.json", "app_index.json", "folder_index.json",
+                   "alen_rl_model.zip", "alen_rl_model.actions.json", "alen_rl_model.version.json",
+                   "alen_bandit_model.npz"]
+COMMANDS = ["time", "open chrome", "launch notepad", "mute", "increase volume", "lock"]
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        "n": len(ordered),
+        "p50_ms": 1000 * percentile(ordered, 0.50),
+        "p95_ms": 1000 * percentile(ordered, 0.95),
+        "p99_ms": 1000 * percentile(ordered, 0.99),
+        "max_ms": 1000 * ordered[-1],
+    }
+
+
+def load_states(path):
+    if path.endswith(".jsonl"):
+        records = InteractionStore(path, legacy_path=None).load()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    return [record["state"] for record in records if record.get("state")]
+
+
+def synthetic_corpus(size, memory_keys, rng):
+    # Roughly: half known facts, a few commands, the rest open questions (some unanswerable)
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.5 and memory_keys:
+            corpus.append(rng.choice(memory_keys))
+        elif roll < 0.6:
+            corpus.append(rng.choice(COMMANDS))
+        elif roll < 0.8:
+            corpus.append("unknown " + random_phrase(rng, 2))
+        else:
+            corpus.append("what is " + random_phrase(rng, 2))
+    return corpus
+
+
+def prepare_workdir(source_dir, memory_size, rng):
+    for name in KNOWLEDGE_FILES:
+        path = os.path.join(source_dir, name)
+        if os.path.exists(path):
+            shutil.copy(path, name)
+    for name in ("app_index.json", "folder_index.json"):
+        if not os.path.exists(name):
+            write_json(name, {})  # Never trigger a disk scan from the load test
+    memory = {}
+    if os.path.exists("memory.json"):
+        with open("memory.json", "r") as f:
+            memory = json.load(f)
+    for _ in range(memory_size):
+        memory[random_phrase(rng)] = random_phrase(rng, 6)
+    write_json("memory.json", memory)
+    return list(memory)
+
+
+class MemorySampler:
+    """Samples tracemalloc (and peak RSS where available) every `interval` seconds."""
+
+    def __init__(self, interval, progress, trace=True):
+        self.interval = interval
+        self.progress = progress
+        self.trace = trace
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started = None
+
+    def sample(self):
+        current, peak = tracemalloc.get_traced_memory() if self.trace else (0, 0)
+        entry = {"t": time.perf_counter() - self._started, "completed": self.progress(),
+                 "traced_mb": current / 2**20, "traced_peak_mb": peak / 2**20}
+        if resource is not None:
+            entry["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.samples.append(entry)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if self.trace:
+            tracemalloc.start()
+        self._started = time.perf_counter()
+        self.sample()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        if self.trace:
+            tracemalloc.stop()
+
+
+def http_answerer(url):
+    host, port = url.split("//", 1)[1].split(":")
+    local = threading.local()
+
+    def answer(text):
+        # One keep-alive connection per load thread
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(host, int(port), timeout=30)
+        conn.request("POST", "/query", json.dumps({"text": text}), {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return json.loads(response.read())
+
+    return answer
+
+
+def run_load(answer, corpus, total, concurrency, rate, results, errors, log=None):
+    """Start `concurrency` threads replaying `total` requests; returns (threads, start time)."""
+    counter = itertools.count()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def worker():
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            text = corpus[i % len(corpus)]
+            scheduled = start + i / rate if rate else None
+            if scheduled is not None:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            began = time.perf_counter()
+            try:
+                result = answer(text)
+                if log is not None:
+                    log(text, result["response"], 0)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            # With a target rate, latency counts from the scheduled send time so a
+            # backed-up pipeline shows up as latency rather than a lower send rate
+            latency = time.perf_counter() - (scheduled if scheduled is not None else began)
+            with lock:
+                results.append((result["source"], latency))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    return threads, start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded or synthetic queries through ALEN.")
+    parser.add_argument("--dataset", help="interaction log to replay (.jsonl or legacy .json); "
+                                          "defaults to the log in the current directory")
+    parser.add_argument("--synthetic", type=int, default=0, help="use a synthetic corpus of this size instead")
+    parser.add_argument("--memory-size", type=int, default=0, help="extra synthetic facts added to memory.json")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="target requests/second (0 = as fast as possible)")
+    parser.add_argument("--search-delay", type=float, default=0.05, help="stub search latency in seconds")
+    parser.add_argument("--log-interactions", action="store_true", help="also append every answer to the log")
+    parser.add_argument("--http", action="store_true", help="go through service.py instead of calling the pipeline")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="seconds between memory samples")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="skip tracemalloc (it slows Python down noticeably); RSS is still sampled")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    source_dir = os.getcwd()
+    dataset = args.dataset or next((name for name in (INTERACTIONS_LOG_FILE, LEGACY_INTERACTIONS_FILE)
+                                    if os.path.exists(name)), INTERACTIONS_LOG_FILE)
+    dataset = os.path.abspath(dataset)
+    output = os.path.abspath(args.output)
+    install_stubs()
+
+    with tempfile.TemporaryDirectory(prefix="alen-load-") as workdir:
+        os.chdir(workdir)
+        try:
+            memory_keys = prepare_workdir(source_dir, args.memory_size, rng)
+            if args.synthetic or not os.path.exists(dataset):
+                corpus = synthetic_corpus(args.synthetic or args.requests, memory_keys, rng)
+                corpus_name = f"synthetic ({len(corpus)})"
+            else:
+                corpus = load_states(dataset)
+                rng.shuffle(corpus)
+                corpus_name = f"{os.path.basename(dataset)} ({len(corpus)} states)"
+            if not corpus:
+                sys.exit("Nothing to replay: the dataset has no states.")
+            report = run(args, corpus, corpus_name, memory_keys)
+        finally:
+            os.chdir(source_dir)
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"💾 Results written to {output}")
+
+
+def run(args, corpus, corpus_name, memory_keys):
+    import alen_backend as backend
+    import search_client
+    from tracing import tracer
+
+    backend.train_rl_model = lambda: None  # Keep the trainer out of the measurement
+    with StubSearchServer(delay=args.search_delay) as stub:
+        search_client.default_client.base_url = stub.url
+        pipeline = backend.build_pipeline(allow_os_actions=False, is_online=lambda: True,
+                                          max_workers=max(8, 4 * args.concurrency))
+        service = None
+        if args.http:
+            from service import ALENService
+            service = ALENService(pipeline, port=0, log_interactions=args.log_interactions).start()
+            answer, log = http_answerer(service.url), None
+        else:
+            answer = pipeline.answer
+            log = backend.log_interaction if args.log_interactions else None
+
+        print(f"🚦 Replaying {args.requests} requests from {corpus_name}, {len(memory_keys)} facts in memory, "
+              f"concurrency {args.concurrency}, rate {args.rate or 'unlimited'}")
+        results, errors = [], []
+        sampler = MemorySampler(args.sample_interval, lambda: len(results), trace=not args.no_tracemalloc)
+        sampler.start()
+        threads, started = run_load(answer, corpus, args.requests, args.concurrency, args.rate,
+                                    results, errors, log)
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        sampler.stop()
+        if service is not None:
+            service.stop()
+        else:
+            pipeline.close()
+        search_requests = stub.requests
+
+    by_source = {}
+    for source, latency in results:
+        by_source.setdefault(source, []).append(latency)
+    samples = sampler.samples
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "params": {key: value for key, value in vars(args).items() if key != "output"},
+        "corpus": corpus_name,
+        "memory_facts": len(memory_keys),
+        "completed": len(results),
+        "errors": len(errors),
+        "wall_seconds": wall,
+        "throughput_rps": len(results) / wall if wall else 0.0,
+        "search_requests": search_requests,
+        "latency": latency_summary([latency for _, latency in results]) if results else None,
+        "latency_by_source": {source: latency_summary(values) for source, values in sorted(by_source.items())},
+        "stages": tracer.snapshot()["stages"],
+        "memory": {
+            "tracemalloc": sampler.trace,
+            "traced_growth_mb": samples[-1]["traced_mb"] - samples[0]["traced_mb"],
+            "traced_peak_mb": samples[-1]["traced_peak_mb"],
+            "samples": samples,
+        },
+    }
+    print_report(report, errors)
+    return report
+
+
+def print_report(report, errors):
+    print(f"✅ {report['completed']} done, {report['errors']} errors in {report['wall_seconds']:.2f}s "
+          f"-> {report['throughput_rps']:.1f} req/s ({report['search_requests']} stub searches)")
+    print(f"{'source':10} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(report["latency_by_source"].items())
+    if report["latency"]:
+        rows.append(("all", report["latency"]))
+    for source, s in rows:
+        print(f"{source:10} {s['n']:7} {s['p50_ms']:9.2f} {s['p95_ms']:9.2f} {s['p99_ms']:9.2f} {s['max_ms']:9.2f}")
+    print("Stage p50/p95 (bucket bounds):")
+    for name, s in sorted(report["stages"].items()):
+        print(f"  {name:18} n={s['count']:<7} p50 {s['p50'] * 1000:8.2f} ms  p95 {s['p95'] * 1000:8.2f} ms")
+    memory = report["memory"]
+    if memory["tracemalloc"]:
+        print(f"🧠 traced memory grew {memory['traced_growth_mb']:+.2f} MB (peak {memory['traced_peak_mb']:.2f} MB)")
+    for sample in memory["samples"]:
+        traced = f"  {sample['traced_mb']:8.2f} MB traced" if memory["tracemalloc"] else ""
+        rss = f"  max RSS {sample['max_rss_mb']:.0f} MB" if "max_rss_mb" in sample else ""
+        print(f"  {sample['t']:7.1f}s  {sample['completed']:7} done{traced}{rss}")
+    if errors:
+        print(f"⚠ First error: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Headless benchmarks for ALEN's hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --compare bench_results.json
+
+Audio, TTS, GUI automation, Whisper and the sentence encoder are stubbed
+(see benchmarks/stubs.py), and every run happens in a scratch directory,
+so the real memory, aliases and interaction files are never touched.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stubs import install_stubs, StubSearchServer
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    n = len(ordered)
+    return {
+        "n": n,
+        "mean_ms": 1000 * sum(ordered) / n,
+        "p50_ms": 1000 * ordered[n // 2],
+        "p95_ms": 1000 * ordered[min(n - 1, int(n * 0.95))],
+        "max_ms": 1000 * ordered[-1],
+    }
+
+
+def measure(func, args_list):
+    durations = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def random_phrase(rng, words=3):
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(words))
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def bench_memory_response(backend, sizes, queries, rng):
+    results = {}
+    for size in sizes:
+        memory = {random_phrase(rng): random_phrase(rng, 6) for _ in range(size)}
+        write_json(backend.MEMORY_FILE, memory)
+        keys = list(memory)
+        start = time.perf_counter()
+        backend.memory_response(keys[0])  # Builds the index for this file
+        backend.memory_index.wait_embedded()
+        build = time.perf_counter() - start
+        hits = [(rng.choice(keys),) for _ in range(queries)]
+        misses = [(random_phrase(rng),) for _ in range(queries)]
+        results[str(size)] = {
+            "index_build_ms": 1000 * build,
+            "hit": measure(backend.memory_response, hits),
+            "miss": measure(backend.memory_response, misses),
+        }
+    return results
+
+
+def bench_apply_aliases(backend, sizes, queries, rng):
+    results = {}
+    for size in sizes:
+        aliases = {random_phrase(rng, 2): random_phrase(rng, 2) for _ in range(size)}
+        write_json(backend.ALIASES_FILE, aliases)
+        keys = list(aliases)
+        backend.apply_aliases(keys[0])
+        results[str(size)] = measure(backend.apply_aliases, [(rng.choice(keys),) for _ in range(queries)])
+    return results
+
+
+def bench_log_interaction(backend, sizes, queries, rng):
+    results = {}
+    backend.train_rl_model = lambda: None  # Never start training from the benchmark
+    for size in sizes:
+        store = backend.interaction_store
+        with open(store.path, "w", encoding="utf-8") as f:
+            for _ in range(size):
+                f.write(json.dumps({"state": random_phrase(rng), "action": random_phrase(rng),
+                                    "reward": 0, "timestamp": "2025-01-01T00:00:00"}) + "\n")
+        store._count = None
+        args = [(random_phrase(rng), random_phrase(rng), 1) for _ in range(queries)]
+        results[str(size)] = measure(backend.log_interaction, args)
+    return results
+
+
+def bench_app_match(backend, sizes, queries, rng):
+    results = {}
+    for size in sizes:
+        apps = {random_phrase(rng, 2): f"C:/Apps/{i}.exe" for i in range(size)}
+        apps["google chrome"] = "C:/Apps/chrome.lnk"
+        apps["chrome"] = "C:/Apps/chrome.exe"
+        write_json(backend.APP_INDEX_FILE, apps)
+        backend.find_best_app_match("chrome")  # Builds the name index
+        keys = list(apps)
+        results[str(size)] = {
+            "exact": measure(backend.find_best_app_match, [(rng.choice(keys),) for _ in range(queries)]),
+            "prefix": measure(backend.find_best_app_match, [(rng.choice(keys)[:4],) for _ in range(queries)]),
+            "fuzzy": measure(backend.find_best_app_match, [("chrmoe",) for _ in range(max(1, queries // 10))]),
+        }
+    return results
+
+
+def write_dataset(path, size, rng, actions=20):
+    replies = [random_phrase(rng, 5) for _ in range(actions)]
+    states = [random_phrase(rng) for _ in range(max(1, size // 5))]
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(size):
+            f.write(json.dumps({"state": rng.choice(states), "action": rng.choice(replies),
+                                "reward": 1, "timestamp": "2025-01-01T00:00:00"}) + "\n")
+
+
+def bench_env_step(sizes, steps, rng):
+    from alen_env import ALENEnv
+    results = {}
+    for size in sizes:
+        path = f"env_{size}.jsonl"
+        write_dataset(path, size, rng)
+        entry = {}
+        for precompute in (False, True):
+            start = time.perf_counter()
+            env = ALENEnv(dataset_path=path, precompute=precompute)
+            construct = time.perf_counter() - start
+            env.reset(seed=0)
+            start = time.perf_counter()
+            for _ in range(steps):
+                env.reset()
+                env.step(env.action_space.sample())
+            elapsed = time.perf_counter() - start
+            entry["precomputed" if precompute else "per_step_encode"] = {
+                "construct_ms": 1000 * construct,
+                "steps_per_second": steps / elapsed,
+            }
+        results[str(size)] = entry
+    return results
+
+
+def bench_policy_inference(backend, queries, rng):
+    try:
+        from stable_baselines3 import PPO
+    except ImportError:
+        return {"skipped": "stable_baselines3 is not installed"}
+    from alen_env import ALENEnv
+    from action_catalog import build_catalog
+    from model_registry import ModelRegistry, publish_model
+
+    write_dataset(backend.interaction_store.path, 200, rng)
+    env = ALENEnv(dataset_path=backend.interaction_store.path, precompute=True)
+    actions = build_catalog(env.data)
+    publish_model(PPO("MlpPolicy", env, n_steps=64, device="cpu"), actions)
+
+    backend.model_registry = ModelRegistry()
+    start = time.perf_counter()
+    backend.predict_response_from_model("warm up")
+    cold = time.perf_counter() - start
+    inputs = [(rng.choice(env.data)["state"],) for _ in range(queries)]
+    return {"cold_ms": 1000 * cold, "warm": measure(backend.predict_response_from_model, inputs)}
+
+
+def bench_search(queries, rng):
+    from search_client import SearchClient
+    with StubSearchServer() as server:
+        client = SearchClient(base_url=server.url, cache_path=None)
+        misses = [(random_phrase(rng),) for _ in range(queries)]
+        miss = measure(client.search, misses)
+        hit = measure(client.search, misses)
+        return {"miss": miss, "hit": hit, "stats": client.stats()}
+
+
+def run(sizes, queries, steps, seed):
+    rng = random.Random(seed)
+    install_stubs()
+    import alen_backend as backend
+
+    results = {}
+    benches = [
+        ("memory_response", lambda: bench_memory_response(backend, sizes, queries, rng)),
+        ("apply_aliases", lambda: bench_apply_aliases(backend, sizes, queries, rng)),
+        ("log_interaction", lambda: bench_log_interaction(backend, sizes, queries, rng)),
+        ("find_best_app_match", lambda: bench_app_match(backend, sizes, queries, rng)),
+        ("alen_env_step", lambda: bench_env_step(sizes, steps, rng)),
+        ("policy_inference", lambda: bench_policy_inference(backend, queries, rng)),
+        ("search_duckduckgo", lambda: bench_search(queries, rng)),
+    ]
+    for name, bench in benches:
+        print(f"⏱ {name}...")
+        results[name] = bench()
+    return results
+
+
+def flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flatten(f"{prefix}.{key}" if prefix else key, item, out)
+    elif isinstance(value, (int, float)):
+        out[prefix] = value
+    return out
+
+
+def compare(previous, current):
+    # Only latency-style metrics: higher is worse for *_ms, better for *_per_second
+    before = flatten("", previous["results"], {})
+    after = flatten("", current["results"], {})
+    print(f"{'metric':70} {'before':>10} {'after':>10} {'change':>8}")
+    for key in sorted(before.keys() & after.keys()):
+        if not (key.endswith("_ms") or key.endswith("_per_second")) or not before[key]:
+            continue
+        change = after[key] / before[key] - 1
+        print(f"{key:70} {before[key]:10.3f} {after[key]:10.3f} {change:+8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ALEN pipeline stages headlessly.")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated knowledge-base/dataset sizes")
+    parser.add_argument("--queries", type=int, default=200, help="timed calls per measurement")
+    parser.add_argument("--steps", type=int, default=2000, help="ALENEnv steps per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    output = os.path.abspath(args.output)
+    previous = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            previous = json.load(f)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="alen-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            results = run(sizes, args.queries, args.steps, args.seed)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": {"sizes": sizes, "queries": args.queries, "steps": args.steps, "seed": args.seed},
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"💾 Results written to {output}")
+    if previous:
+        compare(previous, report)
+
+
+if __name__ == "__main__":
+    main()
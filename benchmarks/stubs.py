@@ -0,0 +1,124 @@
+import ctypes
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+EMBEDDING_DIM = 384
+
+started_files = []
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer: one unit vector per text."""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        self.calls += 1
+        out = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(np.float32)
+            out[i] = vector / np.linalg.norm(vector)
+        return out[0] if single else out
+
+
+class _SilentEngine:
+    def setProperty(self, *args):
+        pass
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def save_to_file(self, text, path):
+        pass
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install_stubs():
+    """Replace audio, GUI-automation and model modules so ALEN runs headless."""
+    silence = lambda frames, **kwargs: np.zeros((int(frames), 1), dtype=np.float32)
+    sys.modules["sounddevice"] = _module(
+        "sounddevice", rec=silence, wait=lambda: None, play=lambda *a, **k: None, stop=lambda: None,
+        query_devices=lambda *a, **k: {"name": "stub input"})
+    sys.modules["soundfile"] = _module(
+        "soundfile", read=lambda *a, **k: (np.zeros(1, dtype=np.float32), 16000), write=lambda *a, **k: None)
+    sys.modules["pyttsx3"] = _module("pyttsx3", init=_SilentEngine)
+    sys.modules["pyautogui"] = _module("pyautogui", press=lambda *a, **k: None)
+    sys.modules["whisper"] = _module(
+        "whisper", load_model=lambda *a, **k: types.SimpleNamespace(transcribe=lambda *a, **k: {"text": ""}))
+    sys.modules["sentence_transformers"] = _module("sentence_transformers", SentenceTransformer=HashEncoder)
+
+    # Windows-only calls; record instead of launching anything
+    os.startfile = started_files.append
+    if not hasattr(ctypes, "windll"):
+        ctypes.windll = types.SimpleNamespace(shell32=types.SimpleNamespace(IsUserAnAdmin=lambda: 1))
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        if server.delay:
+            time.sleep(server.delay)
+        server.requests += 1
+        # Queries containing "unknown" get an empty answer, like a real miss
+        if "unknown" in self.path:
+            payload = {}
+        else:
+            payload = {"Abstract": "This is a stub answer. It has two sentences. And a third."}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubSearchServer:
+    """Local DuckDuckGo look-alike on 127.0.0.1 with optional artificial latency."""
+
+    def __init__(self, delay=0.0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+        self._server.delay = delay
+        self._server.requests = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,113 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+from types import MappingProxyType
+
+
+def write_json_atomic(path, data, indent=4):
+    """Write JSON through a unique temp file plus fsync and os.replace.
+
+    Concurrent writers (the app and the trainer process) each get their own
+    temp file, and readers only ever see a complete file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)  # ASCII-escaped, so any reader's encoding works
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CachedJSONFile:
+    """A JSON file kept in memory, re-read only when its mtime/size changes.
+
+    Saves go through a temp file in the same directory plus os.replace, so a
+    crash mid-write leaves either the old or the new file, never a torn one.
+    `load()` hands out a private copy that callers may edit and save back;
+    hot read-only paths use `view()`, which shares the cached data.
+    """
+
+    def __init__(self, path, default=dict, indent=4):
+        self.path = path
+        self.default = default
+        self.indent = indent
+        self._data = None
+        self._view = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _current(self):
+        stamp = self.stamp()
+        with self._lock:
+            if self._data is not None and stamp == self._stamp:
+                self.hits += 1
+                return self._view
+            self.misses += 1
+            if stamp is None:
+                data = self.default()
+            else:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            self._set(data, stamp)
+            return self._view
+
+    def _set(self, data, stamp):
+        self._data, self._stamp = data, stamp
+        self._view = MappingProxyType(data)  # Same object until the data changes
+
+    def load(self):
+        return copy.deepcopy(dict(self._current()))
+
+    def view(self):
+        """Read-only mapping over the cached data; do not mutate nested values."""
+        return self._current()
+
+    def save(self, data):
+        with self._lock:
+            write_json_atomic(self.path, data, self.indent)
+            self._set(copy.deepcopy(data), self.stamp())
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+            self._view = None
+            self._stamp = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path, default=dict):
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CachedJSONFile(path, default=default)
+        return _stores[path]
+
+
+def cache_stats():
+    with _stores_lock:
+        return {path: store.stats() for path, store in _stores.items()}
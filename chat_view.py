@@ -0,0 +1,147 @@
+import datetime
+import json
+import os
+import threading
+import tkinter as tk
+
+CHAT_HISTORY_DIR = "chat_history"
+CHAT_EXPORT_FILE = "chat_history.txt"
+
+
+def format_message(entry):
+    return f"{entry['sender']} ({entry['time']}): {entry['message']}\n\n"
+
+
+class ChatHistory:
+    """Append-only JSONL log of one chat session, readable by message index."""
+
+    def __init__(self, directory=CHAT_HISTORY_DIR):
+        os.makedirs(directory, exist_ok=True)
+        session = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, f"session-{session}.jsonl")
+        self._offsets = []
+        self._size = 0
+        self._exported = 0
+        self._lock = threading.Lock()
+
+    def append(self, sender, message):
+        entry = {"sender": sender, "message": message, "time": datetime.datetime.now().strftime("%H:%M")}
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line)
+            self._offsets.append(self._size)
+            self._size += len(line)
+        return entry
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def read(self, start, end):
+        with self._lock:
+            offsets = self._offsets[start:end]
+        if not offsets:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(offsets[0])
+            return [json.loads(f.readline()) for _ in offsets]
+
+    def export_text(self, path=CHAT_EXPORT_FILE):
+        """Append messages not yet exported to a plain-text transcript."""
+        with self._lock:
+            start, end = self._exported, len(self._offsets)
+        entries = self.read(start, end)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(format_message(entry) for entry in entries))
+        self._exported = end
+        return len(entries)
+
+
+class ChatView:
+    """Renders only the newest `max_rendered` messages of a ChatHistory.
+
+    Each rendered message starts at a text mark "msg<index>", so trimming
+    the oldest one is a single delete. Older messages can be paged back in
+    from the history file through a link at the top of the widget.
+    """
+
+    def __init__(self, text, history, max_rendered=200, page_size=50):
+        self.text = text
+        self.history = history
+        self.max_rendered = max_rendered
+        self.page_size = page_size
+        self.first = 0
+        self._widgets = {}
+        text.tag_configure("more", foreground="#1e88e5", underline=True, justify="center")
+        text.tag_bind("more", "<Button-1>", lambda e: self.load_earlier())
+
+    def _tag(self, sender):
+        return "user" if sender.startswith("You") else "bot"
+
+    def _insert_before(self, index, chunk, tags):
+        # Returns the index just past the inserted text without counting characters
+        self.text.mark_set("chat_insert", index)
+        self.text.mark_gravity("chat_insert", tk.RIGHT)
+        self.text.insert("chat_insert", chunk, tags)
+        return self.text.index("chat_insert")
+
+    def add_message(self, sender, message, make_widget=None):
+        """Append a message; `make_widget(parent)` builds a widget shown right under it."""
+        entry = self.history.append(sender, message)
+        index = len(self.history) - 1
+        self.text.config(state=tk.NORMAL)
+        self.text.mark_set(f"msg{index}", "end-1c")
+        self.text.mark_gravity(f"msg{index}", tk.LEFT)
+        self.text.insert(tk.END, format_message(entry), self._tag(sender))
+        if make_widget is not None:
+            self._attach_widget(index, make_widget(self.text))
+        self._trim()
+        self.text.config(state=tk.DISABLED)
+        self.text.see(tk.END)
+        return index
+
+    def _attach_widget(self, index, widget):
+        # Inserted in the same call as its message, so it sits under it and is trimmed with it
+        self.text.window_create(tk.END, window=widget)
+        self.text.insert(tk.END, "\n\n")
+        self._widgets.setdefault(index, []).append(widget)
+
+    def _drop_widgets(self, index):
+        for widget in self._widgets.pop(index, []):
+            if widget.winfo_exists():
+                widget.destroy()
+
+    def _trim(self):
+        last = len(self.history)
+        while last - self.first > self.max_rendered:
+            self.text.delete(f"msg{self.first}", f"msg{self.first + 1}")
+            self.text.mark_unset(f"msg{self.first}")
+            self._drop_widgets(self.first)
+            self.first += 1
+        self._update_more_link()
+
+    def _update_more_link(self):
+        ranges = self.text.tag_ranges("more")
+        if ranges:
+            self.text.delete(ranges[0], ranges[1])
+        if self.first > 0:
+            end = self._insert_before("1.0", f"⬆ Show {min(self.first, self.page_size)} earlier messages\n", "more")
+            self.text.mark_set(f"msg{self.first}", end)
+
+    def load_earlier(self):
+        start = max(0, self.first - self.page_size)
+        entries = self.history.read(start, self.first)
+        if not entries:
+            return
+        self.text.config(state=tk.NORMAL)
+        for index in range(self.first - 1, start - 1, -1):
+            entry = entries[index - start]
+            position = self.text.index(f"msg{index + 1}")
+            end = self._insert_before(position, format_message(entry), self._tag(entry["sender"]))
+            self.text.mark_set(f"msg{index}", position)
+            self.text.mark_gravity(f"msg{index}", tk.LEFT)
+            self.text.mark_set(f"msg{index + 1}", end)
+        self.first = start
+        self._update_more_link()
+        self.text.config(state=tk.DISABLED)
+        self.text.see("1.0")
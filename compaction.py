@@ -0,0 +1,100 @@
+import datetime
+import math
+from cached_store import CachedJSONFile
+from embedding_cache import normalize_text
+from interaction_store import default_store
+
+COMPACT_DATASET_FILE = "interaction_dataset.compact.json"
+RECENCY_HALF_LIFE_DAYS = 90
+MIN_RECENCY = 0.1  # Old knowledge fades but is never dropped
+
+
+def _empty_table():
+    return {"source": None, "offset": 0, "events": 0, "aggregates": []}
+
+
+def fold(records, aggregates=None):
+    """Fold raw interaction records into {(state, action): aggregate}, keeping first-seen order."""
+    aggregates = {} if aggregates is None else aggregates
+    for record in records:
+        state, action = record.get("state"), record.get("action")
+        if not state or action is None:
+            continue
+        reward = record.get("reward") or 0
+        seen = record.get("timestamp")
+        key = (normalize_text(state), action)
+        aggregate = aggregates.get(key)
+        if aggregate is None:
+            aggregates[key] = {"state": state, "action": action, "count": 1, "reward_sum": reward,
+                               "feedback": int(reward != 0), "first_seen": seen, "last_seen": seen}
+            continue
+        aggregate["count"] += 1
+        aggregate["reward_sum"] += reward
+        aggregate["feedback"] += int(reward != 0)
+        if seen and (aggregate["last_seen"] is None or seen > aggregate["last_seen"]):
+            aggregate["last_seen"] = seen
+    return aggregates
+
+
+def sample_weight(aggregate, now=None, half_life_days=RECENCY_HALF_LIFE_DAYS):
+    """How often a training episode should draw this (state, action) pair."""
+    if aggregate["reward_sum"] < 0:
+        return 0.0  # Net-disliked replies are not worth imitating
+    recency = 1.0
+    if aggregate.get("last_seen") and half_life_days:
+        now = now or datetime.datetime.now()
+        try:
+            age = (now - datetime.datetime.fromisoformat(aggregate["last_seen"])).total_seconds() / 86400
+        except (TypeError, ValueError):
+            age = 0.0
+        recency = max(math.pow(0.5, max(age, 0.0) / half_life_days), MIN_RECENCY)
+    return aggregate["count"] * recency
+
+
+def load_compact(path=COMPACT_DATASET_FILE):
+    return CachedJSONFile(path, default=_empty_table, indent=None).load()["aggregates"]
+
+
+class InteractionCompactor:
+    """Keeps a compact (state, action) table in step with the interaction log.
+
+    The table records the byte offset it has read up to, so each run only
+    parses lines appended since the previous one. The raw log is left alone.
+    """
+
+    def __init__(self, store=None, path=COMPACT_DATASET_FILE):
+        self.store = default_store if store is None else store
+        self.table = CachedJSONFile(path, default=_empty_table, indent=None)
+
+    def load(self):
+        return self.table.load()["aggregates"]
+
+    def compact(self):
+        table = self.table.load()
+        offset = table["offset"]
+        if table["source"] != self.store.path or self.store.size() < offset:
+            # Different or rewritten log: fold it again from the start
+            table, offset = _empty_table(), 0
+        aggregates = {(normalize_text(a["state"]), a["action"]): dict(a) for a in table["aggregates"]}
+        records, end = self.store.read_from(offset)
+        stats = {"events": table["events"] + len(records), "new_events": len(records)}
+        if records or not self.table.exists():
+            fold(records, aggregates)
+            self.table.save({
+                "source": self.store.path,
+                "offset": end,
+                "events": stats["events"],
+                "compacted_at": datetime.datetime.now().isoformat(),
+                "aggregates": list(aggregates.values()),
+            })
+        stats["aggregates"] = len(aggregates)
+        return stats
+
+
+def compact_interactions(store=None, path=COMPACT_DATASET_FILE):
+    return InteractionCompactor(store, path).compact()
+
+
+if __name__ == "__main__":
+    stats = compact_interactions()
+    print(f"🗜 {stats['events']} interactions ({stats['new_events']} new) -> {stats['aggregates']} unique pairs")
@@ -0,0 +1,83 @@
+import socket
+import threading
+import time
+
+
+class ConnectivityMonitor:
+    """Background reachability probe with a cached online/offline flag.
+
+    Probes use a short connect timeout. While online they repeat every
+    `interval` seconds; while offline the wait doubles from `min_backoff`
+    up to `max_backoff`. `online` is None until the first probe finishes.
+    """
+
+    def __init__(self, host="1.1.1.1", port=53, timeout=1.5, interval=15.0,
+                 min_backoff=2.0, max_backoff=60.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.interval = interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.online = None
+        self.last_checked = None
+        self._listeners = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def probe(self):
+        try:
+            socket.create_connection((self.host, self.port), timeout=self.timeout).close()
+            return True
+        except OSError:
+            return False
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def check_now(self):
+        self._wake.set()
+
+    def subscribe(self, callback):
+        # Called from the monitor thread with the new state on every change
+        self._listeners.append(callback)
+
+    def is_online(self):
+        # Unknown counts as online so the first search is still attempted
+        return self.online is not False
+
+    def _run(self):
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            online = self.probe()
+            changed = online != self.online
+            self.online = online
+            self.last_checked = time.time()
+            if changed:
+                for callback in list(self._listeners):
+                    try:
+                        callback(online)
+                    except Exception as e:
+                        print(f"Connectivity listener failed: {e}")
+            if online:
+                backoff = self.min_backoff
+                wait = self.interval
+            else:
+                wait = backoff
+                backoff = min(backoff * 2, self.max_backoff)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+
+monitor = ConnectivityMonitor()
@@ -0,0 +1,163 @@
+import contextlib
+import hashlib
+import os
+import threading
+import numpy as np
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+EMBEDDING_CACHE_PREFIX = "embedding_cache"
+EMBEDDING_DIM = 384  # multi-qa-MiniLM-L6-cos-v1
+
+
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+
+def text_key(text):
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    # Exclusive lock shared by every process using the same cache files
+    with open(path, "a+b") as f:
+        if msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        elif fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            elif fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class EmbeddingCache:
+    """Content-addressed sentence embeddings persisted across runs.
+
+    Vectors live in an append-only raw matrix (<prefix>.bin) read through a
+    memory map; <prefix>.idx maps "<sha1> <row>" per line. Each distinct
+    normalized text is encoded once and then served from disk. Appends are
+    serialized across processes with a lock on <prefix>.lock.
+    """
+
+    def __init__(self, prefix=EMBEDDING_CACHE_PREFIX, dim=EMBEDDING_DIM, dtype="float32", encoder=None):
+        self.data_path = prefix + ".bin"
+        self.index_path = prefix + ".idx"
+        self.lock_path = prefix + ".lock"
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = dim * self.dtype.itemsize
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._index_offset = 0
+        self._matrix = None
+        self.hits = 0
+        self.misses = 0
+
+    def _get_encoder(self):
+        if self._encoder is None:
+            from model_registry import registry
+            self._encoder = registry.get_encoder()
+        return self._encoder
+
+    def _available_rows(self):
+        try:
+            return os.path.getsize(self.data_path) // self.row_bytes
+        except OSError:
+            return 0
+
+    def _refresh_index(self):
+        # Pick up rows appended since the last read (possibly by another process)
+        if not os.path.exists(self.index_path):
+            return
+        available = self._available_rows()
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partial line still being written
+                parts = line.split()
+                if len(parts) == 2:
+                    if int(parts[1]) >= available:
+                        break  # Row not flushed yet; read this entry again next time
+                    self._rows[parts[0].decode("ascii")] = int(parts[1])
+                self._index_offset += len(line)
+        self._matrix = None
+
+    def _get_matrix(self):
+        if self._matrix is None:
+            rows = self._available_rows()
+            if rows == 0:
+                return None
+            self._matrix = np.memmap(self.data_path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+        return self._matrix
+
+    def _append(self, keys, vectors):
+        rows = np.asarray(vectors, dtype=self.dtype).reshape(len(keys), self.dim)
+        with _file_lock(self.lock_path):
+            # Another process may have stored some of these since we checked
+            self._refresh_index()
+            fresh = [i for i, key in enumerate(keys) if key not in self._rows]
+            if not fresh:
+                return
+            start = self._available_rows()
+            with open(self.data_path, "ab") as f:
+                if f.tell() != start * self.row_bytes:
+                    f.truncate(start * self.row_bytes)  # Torn row from a crashed writer
+                f.write(rows[fresh].tobytes())
+            with open(self.index_path, "a", encoding="ascii") as f:
+                f.write("".join(f"{keys[i]} {start + n}\n" for n, i in enumerate(fresh)))
+            self._refresh_index()
+
+    def encode(self, texts):
+        """Return embeddings for a string (1-D) or a list of strings (2-D)."""
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        keys = [text_key(t) for t in texts]
+
+        with self._lock:
+            if any(k not in self._rows for k in keys):
+                self._refresh_index()
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows and key not in missing:
+                    missing[key] = normalize_text(text)
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+            if missing:
+                vectors = self._get_encoder().encode(list(missing.values()))
+                self._append(list(missing.keys()), vectors)
+            matrix = self._get_matrix()
+            result = np.array(matrix[[self._rows[k] for k in keys]], dtype=np.float32)
+
+        return result[0] if single else result
+
+    def __contains__(self, text):
+        with self._lock:
+            key = text_key(text)
+            if key not in self._rows:
+                self._refresh_index()
+            return key in self._rows
+
+    def __len__(self):
+        with self._lock:
+            self._refresh_index()
+            return len(self._rows)
+
+
+default_cache = EmbeddingCache()
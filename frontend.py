@@ -1,12 +1,12 @@
+import startup
 import tkinter as tk
-from PIL import Image, ImageTk, ImageSequence, ImageEnhance
-import datetime
-import socket
-import threading
-from itertools import cycle
-from alen_backend import speak, listen, handle_pc_command, search_duckduckgo
-from alen_backend import memory_response, teach_memory, log_interaction, predict_response_from_model
-from alen_backend import apply_aliases
+from alen_backend import speak, listen, teach_memory, log_interaction, warm_up, build_pipeline
+from connectivity import monitor as connectivity
+from gif_animator import GifAnimator
+from chat_view import ChatHistory, ChatView
+from ui_dispatch import UIDispatcher, BoundedExecutor
+from tracing import tracer
+startup.mark("backend imported")
 
 # === Theme Setup ===
 current_theme = "dark"
@@ -38,72 +38,45 @@ def send_message():
         return
     update_chat("You", user_input)
     entry.delete(0, tk.END)
-    threading.Thread(target=process_message, args=(user_input, False)).start()
+    submit_work(process_message, user_input, False)
 
 
-def process_message(user_input, is_voice=False):
-    user_input = user_input.strip().lower()
-    # 1. Check memory first
-    memory = memory_response(user_input)
-    if memory:
-        response = memory
-        update_chat("ALEN", response)
-        if is_voice:
-            speak(response)
-        log_interaction(user_input, response, 0)
-        show_feedback_buttons(user_input, response)
-        return
+def submit_work(func, *args):
+    # Bounded pool: when it is full the message is refused instead of spawning a thread
+    if workers.submit(func, *args) is None:
+        update_chat("ALEN", "I'm still working on your earlier messages. Please try again in a moment.")
 
-    # 2. Check PC command
-    response = handle_pc_command(user_input)
-    if response:
-        update_chat("ALEN", response)
-        if is_voice:
-            speak(response)
-        log_interaction(user_input, response, 0)
-        show_feedback_buttons(user_input, response)
-        return
 
-    # 3. Fallback to DuckDuckGo search
-    if check_internet():
-        # Try DuckDuckGo
-        response = search_duckduckgo(user_input)
-        if response and response != "Sorry, I couldn't find anything useful.":
-            update_chat("ALEN", response)
-            if is_voice:
-                speak(response)
-            log_interaction(user_input, response, 0)
-            show_feedback_buttons(user_input, response)
-            return
-    
-
-    # 4. Try RL model as fallback
-    model_reply = predict_response_from_model(user_input)
-    if model_reply:
-        response = model_reply
-        update_chat("ALEN (rl)", response)
+def process_message(user_input, is_voice=False):
+    with tracer.request("voice" if is_voice else "gui") as trace:
+        user_input = user_input.strip().lower()
+        # Memory -> PC command -> DuckDuckGo -> RL model, resolved by priority
+        result = pipeline.answer(user_input)
+        response = result["response"]
+        trace.source = result["source"]
+        sender = "ALEN (rl)" if result["source"] == "rl" else "ALEN"
+
+        # Reply and its 👍/👎 buttons go in as one UI update so they can't be split up
+        ui.call(chat_view.add_message, sender, response,
+                lambda parent: feedback_buttons(parent, user_input, response))
         if is_voice:
-            speak(response)
+            speak(response, cache=result["source"] == "memory")
         log_interaction(user_input, response, 0)
-        show_feedback_buttons(user_input, response)
+    if result["source"] != "none":
         return
 
-    # 5. Still no answer — ask user to teach
-    response = "Sorry, I couldn't find anything useful."
-    update_chat("ALEN", response)
-    if is_voice:
-        speak(response)
-    log_interaction(user_input, response, 0)
-    show_feedback_buttons(user_input, response)
+    # Still no answer — ask user to teach
+    ui.call(show_teach_popup, user_input, is_voice)
 
-    # Ask for user teaching
+
+def show_teach_popup(user_input, is_voice):
     def save_user_input():
         user_teach = teach_entry.get().strip()
         if user_teach:
             teach_memory(user_input, user_teach)
             update_chat("ALEN", "Thanks! I’ll remember that.")
             if is_voice:
-                threading.Thread(target=lambda: speak("Thanks! I’ll remember that.")).start()
+                speak("Thanks! I’ll remember that.", cache=True)
         teach_popup.destroy()
 
     teach_popup = tk.Toplevel(window)
@@ -117,8 +90,8 @@ def process_message(user_input, is_voice=False):
     tk.Button(teach_popup, text="Save", command=save_user_input).pack(pady=10)
 
 
-def show_feedback_buttons(user_input, response):
-    feedback_frame = tk.Frame(chat_log, bg="#000000")
+def feedback_buttons(parent, user_input, response):
+    feedback_frame = tk.Frame(parent, bg="#000000")
     feedback_given = {"clicked": False}
     
     def mark_feedback(value):
@@ -143,12 +116,6 @@ def show_feedback_buttons(user_input, response):
     tk.Button(feedback_frame, text="👍", command=lambda: mark_feedback(True), **btn_style).pack(side=tk.LEFT, padx=2)
     tk.Button(feedback_frame, text="👎", command=lambda: mark_feedback(False), **btn_style).pack(side=tk.LEFT, padx=2)
 
-    chat_log.config(state=tk.NORMAL)
-    chat_log.window_create(tk.END, window=feedback_frame)
-    chat_log.insert(tk.END, "\n\n")
-    chat_log.config(state=tk.DISABLED)
-    chat_log.see(tk.END)
-
     # Auto-log positive feedback after 8 seconds if no click
     def auto_log_if_no_feedback():
         if not feedback_given["clicked"]:
@@ -156,29 +123,28 @@ def show_feedback_buttons(user_input, response):
             feedback_frame.destroy()
 
     feedback_frame.after(4000, auto_log_if_no_feedback)  # 8 seconds
+    return feedback_frame
 
 
 def use_voice():
-    threading.Thread(target=process_voice_command).start()
+    submit_work(process_voice_command)
 
 def process_voice_command():
-    def handle_voice():
-        command = listen()
+    with tracer.request("voice"):
+        with tracer.span("listen"):
+            command = listen()
         update_chat("You (voice)", command)
-        threading.Thread(target=process_message, args=(command, True)).start()
+        process_message(command, True)
 
-    threading.Thread(target=handle_voice).start()
 
+def report_worker_error(error):
+    # Runs on the worker thread; the traceback is already printed
+    update_chat("ALEN", f"Sorry, something went wrong: {error}")
 
-def update_chat(sender, message):
-    chat_log.config(state=tk.NORMAL)
-    timestamp = datetime.datetime.now().strftime("%H:%M")
-    tag = "user" if sender.startswith("You") else "bot"
 
-    formatted_message = f"{sender} ({timestamp}): {message}\n\n"
-    chat_log.insert(tk.END, formatted_message, tag)
-    chat_log.config(state=tk.DISABLED)
-    chat_log.see(tk.END)
+def update_chat(sender, message):
+    # Only the newest messages stay in the widget; all of them go to the session log
+    ui.call(chat_view.add_message, sender, message)
 
 
 def style_button(btn, base_color="#1e88e5", hover_color="#1565c0"):
@@ -191,17 +157,19 @@ def style_button(btn, base_color="#1e88e5", hover_color="#1565c0"):
     btn.config(relief="flat", bd=0, highlightthickness=0)
 
 def save_chat():
-    with open("chat_history.txt", "w", encoding="utf-8") as f:
-        f.write(chat_log.get("1.0", tk.END))
+    # Appends only the messages added since the last save
+    chat_view.history.export_text("chat_history.txt")
 
 def check_internet():
-    try:
-        socket.create_connection(("1.1.1.1", 53))
-        return True
-    except OSError:
-        return False
+    return connectivity.is_online()
+
+connectivity.start()
+pipeline = build_pipeline(is_online=check_internet)
 
 window = tk.Tk()
+ui = UIDispatcher(window)
+ui.start()
+workers = BoundedExecutor(max_workers=4, max_pending=8, on_error=report_worker_error)
 window.title("A L E N - Virtual Assistant")
 window.configure(bg=themes[current_theme]["bg"])
 window.geometry("900x1500")  # Fixed window size
@@ -209,12 +177,21 @@ window.geometry("900x1500")  # Fixed window size
 main_frame = tk.Frame(window, bg=themes[current_theme]["bg"])
 main_frame.pack(fill=tk.NONE, expand=False)  # Don't expand the frame
 
-status_text = "Online ✅" if check_internet() else "Offline ❌"
-status_label = tk.Label(main_frame, text=f"Status: {status_text}",
+status_label = tk.Label(main_frame, text="Status: Checking...",
                         fg=themes[current_theme]["status_fg"], bg=themes[current_theme]["bg"],
                         font=("Segoe UI", 10, "bold"), anchor="e")
 status_label.pack(anchor="ne", padx=10, pady=(10, 0))
 
+# The monitor probes in the background; the label just reads its cached state
+def show_internet_status(shown=None):
+    online = connectivity.online
+    if online is not None and online != shown:
+        status_text = "Online ✅" if online else "Offline ❌"
+        status_label.config(text=f"Status: {status_text}")
+    window.after(1000, show_internet_status, online)
+
+window.after(200, show_internet_status)
+
 # === ROUNDED BUTTON CLASS ===
 class RoundedButton(tk.Canvas):
     def __init__(self, parent, text, command, bg, fg, font, width=120, height=40):
@@ -271,10 +248,6 @@ class RoundedButton(tk.Canvas):
 
 
 # === GIF HEADER ===
-gif = Image.open("background.gif")
-original_frames = [frame.copy().convert("RGBA") for frame in ImageSequence.Iterator(gif)]
-frame_cycle = cycle(original_frames)
-
 gif_frame = tk.Frame(main_frame, width=450, height=390, bg=themes[current_theme]["bg"])
 gif_frame.pack_propagate(False)  # Prevent auto-resize
 gif_frame.pack(padx=10, pady=(10, 0))
@@ -283,17 +256,8 @@ gif_frame.pack(padx=10, pady=(10, 0))
 gif_label = tk.Label(gif_frame)
 gif_label.pack(fill=tk.BOTH, expand=True)
 
-def animate_gif():
-    width = gif_frame.winfo_width()
-    height = gif_frame.winfo_height()
-    frame = next(frame_cycle)
-    frame_resized = frame.resize((width, height), Image.LANCZOS)
-    tk_frame = ImageTk.PhotoImage(frame_resized)
-    gif_label.configure(image=tk_frame)
-    gif_label.image = tk_frame
-    window.after(100, animate_gif)
-
-animate_gif()
+gif_animator = GifAnimator(gif_label, gif_frame, "background.gif", window)
+gif_animator.start()
 
 # === CHAT AREA ===
 # Wrapper frame to center the chat area
@@ -320,6 +284,8 @@ chat_window = chat_canvas.create_window(0, 0, anchor='nw', window=chat_log, widt
 chat_log.tag_configure("left", justify="left")
 chat_log.tag_configure("right", justify="right")
 
+chat_view = ChatView(chat_log, ChatHistory(), max_rendered=200)
+
 # === ENTRY BOX ===
 
 # Wrapper frame to center and size the entry box to 800px
@@ -352,4 +318,11 @@ save_btn = RoundedButton(btn_frame, text="💾 Save Chat", command=save_chat, bg
 save_btn.pack(side=tk.LEFT, padx=10)
 
 
+def on_first_idle():
+    startup.mark("window interactive")
+    warm_up()
+    if startup.REPORT_ENABLED:
+        startup.print_report()
+
+window.after_idle(on_first_idle)
 window.mainloop() 
@@ -0,0 +1,167 @@
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from cached_store import write_json_atomic
+
+
+class DirectoryIndexer:
+    """Parallel os.scandir walker that remembers each directory's mtime.
+
+    A rescan still stats every known directory, but only lists the ones
+    whose mtime changed; unchanged directories reuse their saved entries.
+    `match(name, is_dir)` returns the index key for an entry or None.
+    `root_depths` overrides `max_depth` for individual roots. Saved state
+    is discarded when any of these settings change.
+    """
+
+    def __init__(self, roots, match, max_depth=None, exclude=(), state_path=None,
+                 first_wins=False, workers=8, root_depths=None):
+        self.roots = list(roots)
+        self.match = match
+        self.max_depth = max_depth
+        self.root_depths = dict(root_depths or {})
+        self.exclude = [pattern.lower() for pattern in exclude]
+        self.state_path = state_path
+        self.first_wins = first_wins
+        self.workers = workers
+        self.settings_key = self._settings_key()
+        self._state = self._load_state()
+        self.last_scan = {}
+
+    def _settings_key(self):
+        # Saved records hold already-filtered entries, so they only apply to the same settings
+        code = getattr(self.match, "__code__", None)
+        match_id = [getattr(self.match, "__module__", None), getattr(self.match, "__qualname__", repr(self.match)),
+                    hashlib.sha1(code.co_code + repr(code.co_consts).encode("utf-8")).hexdigest() if code else None]
+        settings = [self.roots, self.exclude, self.max_depth, sorted(self.root_depths.items()), match_id]
+        return hashlib.sha1(json.dumps(settings).encode("utf-8")).hexdigest()
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(saved, dict) or saved.get("settings") != self.settings_key:
+            return {}  # Older format or different settings: list everything again
+        return saved.get("directories", {})
+
+    def _save_state(self, state):
+        if not self.state_path:
+            return
+        write_json_atomic(self.state_path, {"settings": self.settings_key, "directories": state}, indent=None)
+
+    def _excluded(self, name):
+        name = name.lower()
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.exclude)
+
+    def _visit(self, path, depth, limit, previous):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return path, depth, limit, None, False
+        if previous and previous["mtime"] == mtime:
+            return path, depth, limit, previous, True
+
+        subdirs, entries = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir and self._excluded(entry.name):
+                        continue
+                    key = self.match(entry.name, is_dir)
+                    if key:
+                        entries.append([key, entry.path])
+                    if is_dir:
+                        subdirs.append(entry.path)
+        except OSError:
+            return path, depth, limit, None, False
+        return path, depth, limit, {"mtime": mtime, "subdirs": subdirs, "entries": entries}, False
+
+    def scan(self):
+        previous = self._state
+        state = {}
+        listed = reused = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._visit, root, 0, self.root_depths.get(root, self.max_depth),
+                                   previous.get(root)) for root in self.roots}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, depth, limit, record, was_reused = future.result()
+                    if record is None:
+                        continue
+                    state[path] = record
+                    reused += was_reused
+                    listed += not was_reused
+                    if limit is None or depth < limit:
+                        for sub in record["subdirs"]:
+                            pending.add(pool.submit(self._visit, sub, depth + 1, limit, previous.get(sub)))
+
+        self._state = state
+        self._save_state(state)
+        self.last_scan = {"directories": len(state), "listed": listed, "reused": reused}
+        return self._collect(state)
+
+    def _collect(self, state):
+        # Deterministic merge: roots in the order given, paths sorted inside each root
+        index = {}
+        for root in self.roots:
+            prefix = os.path.join(root, "")
+            paths = sorted(p for p in state if p == root or p.startswith(prefix))
+            for path in paths:
+                for key, entry_path in state[path]["entries"]:
+                    if self.first_wins and key in index:
+                        continue
+                    index[key] = entry_path
+        return index
+
+
+class BackgroundIndex:
+    """Serves the last saved index while a rescan runs on a worker thread."""
+
+    def __init__(self, indexer, store):
+        self.indexer = indexer
+        self.store = store
+        self._lock = threading.Lock()  # Guards _thread only; never held during a scan
+        self._scan_lock = threading.Lock()
+        self._thread = None
+
+    def rebuild(self):
+        with self._scan_lock:
+            index = self.indexer.scan()
+            self.store.save(index)
+            return index
+
+    def refresh(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._refresh_worker, daemon=True)
+            self._thread.start()
+            return True
+
+    def _refresh_worker(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"Index refresh failed for {self.store.path}: {e}")
+
+    def load(self):
+        # Read-only view: the same object until the index changes, so name lookups can cache on it
+        if not self.store.exists():
+            thread = self._thread
+            if thread is not None and thread.is_alive():
+                thread.join()  # First build already underway; wait for it
+            if not self.store.exists():
+                self.rebuild()
+        return self.store.view()
@@ -0,0 +1,77 @@
+from PIL import Image, ImageTk, ImageSequence
+
+DEFAULT_FRAME_MS = 100
+MAX_CACHED_SIZES = 2
+
+
+class GifAnimator:
+    """Plays an animated GIF in a Tk label from pre-rendered frames.
+
+    Frames are resized once per widget size and kept as PhotoImages, so
+    each tick only swaps the label's image. Ticks follow the GIF's own
+    frame durations and stop while the window is minimized or hidden.
+    """
+
+    def __init__(self, label, container, path, window):
+        self.label = label
+        self.container = container
+        self.window = window
+        gif = Image.open(path)
+        self.frames = []
+        self.durations = []
+        for frame in ImageSequence.Iterator(gif):
+            self.frames.append(frame.copy().convert("RGBA"))
+            self.durations.append(frame.info.get("duration") or gif.info.get("duration") or DEFAULT_FRAME_MS)
+        self._rendered = {}  # (width, height) -> [PhotoImage]
+        self._index = 0
+        self._after_id = None
+        self.paused = False
+
+        window.bind("<Unmap>", self._on_unmap, add="+")
+        window.bind("<Map>", self._on_map, add="+")
+
+    def _size(self):
+        return self.container.winfo_width(), self.container.winfo_height()
+
+    def _frames_for(self, size):
+        frames = self._rendered.get(size)
+        if frames is None:
+            frames = [ImageTk.PhotoImage(frame.resize(size, Image.LANCZOS)) for frame in self.frames]
+            if len(self._rendered) >= MAX_CACHED_SIZES:
+                self._rendered.pop(next(iter(self._rendered)))
+            self._rendered[size] = frames
+        return frames
+
+    def start(self):
+        self.paused = False
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        self.paused = True
+        if self._after_id is not None:
+            self.label.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _on_unmap(self, event):
+        if event.widget is self.window:
+            self.stop()
+
+    def _on_map(self, event):
+        if event.widget is self.window:
+            self.start()
+
+    def _tick(self):
+        self._after_id = None
+        if self.paused:
+            return
+        size = self._size()
+        if size[0] <= 1 or size[1] <= 1:
+            # Not laid out yet
+            self._after_id = self.label.after(DEFAULT_FRAME_MS, self._tick)
+            return
+        frames = self._frames_for(size)
+        self.label.configure(image=frames[self._index])
+        delay = self.durations[self._index]
+        self._index = (self._index + 1) % len(frames)
+        self._after_id = self.label.after(delay, self._tick)
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+
+LEGACY_INTERACTIONS_FILE = "interaction_dataset.json"
+INTERACTIONS_LOG_FILE = "interaction_dataset.jsonl"
+
+
+class InteractionStore:
+    """Append-only JSONL log of interactions (one record per line)."""
+
+    def __init__(self, path=INTERACTIONS_LOG_FILE, legacy_path=LEGACY_INTERACTIONS_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._ready = False
+        self._count = None
+
+    def _ensure_ready(self):
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                self._migrate_legacy()
+                self._ready = True
+
+    def _migrate_legacy(self):
+        # One-time import of the old indent=4 JSON array into the line log
+        if os.path.exists(self.path):
+            return
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        with open(self.legacy_path, "r") as f:
+            data = json.load(f)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in data:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        print(f"📦 Migrated {len(data)} interactions to {self.path}")
+
+    def _count_lines(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as f:
+            return sum(1 for line in f if line.strip())
+
+    def append(self, record):
+        """Append one record and return the total number of records."""
+        self._ensure_ready()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._count is None:
+                self._count = self._count_lines()
+            # A single write on an O_APPEND handle keeps each line intact
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._count += 1
+            return self._count
+
+    def __iter__(self):
+        self._ensure_ready()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-write; skip it
+                    continue
+
+    def load(self):
+        return list(self)
+
+    def read_from(self, offset=0):
+        """Return (records, end_offset) for complete lines starting at byte `offset`."""
+        self._ensure_ready()
+        records = []
+        if not os.path.exists(self.path):
+            return records, 0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partial last line; pick it up next time
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records, offset
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def count(self):
+        self._ensure_ready()
+        with self._lock:
+            if self._count is None:
+                self._count = self._count_lines()
+            return self._count
+
+
+default_store = InteractionStore()
@@ -0,0 +1,209 @@
+import threading
+from collections import Counter
+import numpy as np
+from rapidfuzz import fuzz, process
+from embedding_cache import default_cache, EMBEDDING_DIM
+
+TOKEN_PREFIX_LENGTH = 3
+MAX_POSTING = 512  # Prefixes shared by more keys than this say little about a typo
+MAX_LEXICAL_CANDIDATES = 64
+
+
+def _token_prefixes(text):
+    return {token[:TOKEN_PREFIX_LENGTH] for token in text.split()}
+
+
+class SemanticMemoryIndex:
+    """Taught memories searchable by meaning.
+
+    Keys are kept as a unit-normalized embedding matrix so a lookup is one
+    matrix-vector product plus a top-k; fuzz.ratio is only computed on those
+    k candidates, as the acceptance test for typos and as a tiebreaker.
+    Semantic misses fall back to fuzz.ratio over a bounded candidate pool:
+    keys sharing a word prefix with the command. Exact and lexical lookups
+    work as soon as a key is synced; its embedding can follow on a
+    background thread, so a cold encoder never holds up known answers.
+    """
+
+    def __init__(self, embedding_cache=None, semantic_threshold=0.85, lexical_weight=0.05, top_k=5):
+        self.embeddings = default_cache if embedding_cache is None else embedding_cache
+        self.semantic_threshold = semantic_threshold
+        self.lexical_weight = lexical_weight
+        self.top_k = top_k
+        self.keys = []
+        self.answers = {}
+        self._rows = {}
+        self._prefixes = {}  # First letters of each word -> keys containing it
+        self._pending = {}  # Keys still waiting for an embedding, in insertion order
+        self._idle = threading.Event()  # Cleared while a background thread works through _pending
+        self._idle.set()
+        self._matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._lock = threading.Lock()
+        self.version = None
+
+    def _unit_vectors(self, texts):
+        vectors = np.atleast_2d(self.embeddings.encode(texts)).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _grow(self, extra):
+        needed = len(self.keys) + extra
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix), 64)
+            grown = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+            grown[:len(self.keys)] = self._matrix[:len(self.keys)]
+            self._matrix = grown
+
+    def _set_locked(self, key, answer):
+        if key not in self.answers:
+            for prefix in _token_prefixes(key):
+                self._prefixes.setdefault(prefix, set()).add(key)
+        self.answers[key] = answer
+        if key not in self._rows:
+            self._pending[key] = None
+
+    def _insert_locked(self, keys, vectors):
+        # Only keys still pending: one may have been removed, or embedded by another caller
+        fresh = [(key, vector) for key, vector in zip(keys, vectors) if key in self._pending]
+        for key, _ in fresh:
+            del self._pending[key]
+        if not fresh:
+            return
+        self._grow(len(fresh))
+        start = len(self.keys)
+        for i, (key, vector) in enumerate(fresh):
+            self._matrix[start + i] = vector
+            self._rows[key] = start + i
+            self.keys.append(key)
+
+    def _remove_locked(self, key):
+        self._pending.pop(key, None)
+        row = self._rows.pop(key, None)
+        if row is not None:
+            # Swap the last row into the hole so the matrix stays dense
+            last = len(self.keys) - 1
+            if row != last:
+                moved = self.keys[last]
+                self.keys[row] = moved
+                self._matrix[row] = self._matrix[last]
+                self._rows[moved] = row
+            self.keys.pop()
+        del self.answers[key]
+        for prefix in _token_prefixes(key):
+            keys = self._prefixes[prefix]
+            keys.discard(key)
+            if not keys:
+                del self._prefixes[prefix]
+
+    def _embed_pending(self):
+        # Encode outside the lock so lookups keep being served meanwhile
+        while True:
+            with self._lock:
+                keys = list(self._pending)
+            if not keys:
+                return
+            vectors = self._unit_vectors(keys)
+            with self._lock:
+                self._insert_locked(keys, vectors)
+
+    def _embed_worker(self):
+        while True:
+            try:
+                self._embed_pending()
+            except Exception as e:
+                print(f"Memory embedding failed: {e}")
+                with self._lock:
+                    self._idle.set()
+                return
+            with self._lock:
+                if not self._pending:
+                    self._idle.set()
+                    return
+
+    def _start_embedding_locked(self):
+        if self._pending and self._idle.is_set():
+            self._idle.clear()
+            threading.Thread(target=self._embed_worker, daemon=True, name="alen-memory-embed").start()
+
+    def add(self, key, answer, version=None):
+        with self._lock:
+            self._set_locked(key, answer)
+            if version is not None:
+                self.version = version
+            background = not self._idle.is_set()
+        if not background:
+            self._embed_pending()
+
+    def sync(self, memory, version=None, background=False):
+        """Bring the index in line with a memory dict, touching only changed keys.
+
+        With `background`, new keys are embedded on a worker thread; until
+        then they are found by exact and lexical lookups only.
+        """
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            for key in [k for k in self.answers if k not in memory]:
+                self._remove_locked(key)
+            for key, answer in memory.items():
+                if key not in self.answers or self.answers[key] != answer:
+                    self._set_locked(key, answer)
+            self.version = version
+            if background:
+                self._start_embedding_locked()
+        if not background:
+            self._embed_pending()
+
+    def semantic_ready(self):
+        return self._idle.is_set()
+
+    def wait_embedded(self, timeout=None):
+        """Block until background embedding has finished; False on timeout."""
+        return self._idle.wait(timeout)
+
+    def search(self, command, k=None):
+        """Return up to k (key, semantic score, lexical score) tuples, best first."""
+        k = k or self.top_k
+        if not self.keys:
+            return []
+        query = self._unit_vectors(command)[0]
+        with self._lock:
+            n = len(self.keys)
+            scores = self._matrix[:n] @ query
+            if n > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(n)
+            candidates = [(self.keys[i], float(scores[i]), fuzz.ratio(command, self.keys[i])) for i in top]
+        candidates.sort(key=lambda c: c[1] + self.lexical_weight * c[2] / 100, reverse=True)
+        return candidates
+
+    def lexical_candidates(self, command, limit=MAX_LEXICAL_CANDIDATES):
+        """Keys sharing the most word prefixes with the command, at most `limit` of them."""
+        with self._lock:
+            postings = [self._prefixes[p] for p in _token_prefixes(command) if p in self._prefixes]
+            if not postings:
+                return []
+            narrow = [keys for keys in postings if len(keys) <= MAX_POSTING]
+            if not narrow:
+                # Only common prefixes: a sample of the rarest one, so the cost stays bounded
+                narrow = [set(list(min(postings, key=len))[:MAX_POSTING])]
+            shared = Counter()
+            for keys in narrow:
+                shared.update(keys)
+        return [key for key, _ in shared.most_common(limit)]
+
+    def lookup(self, command, threshold=85):
+        if command in self.answers:
+            return self.answers[command]
+        # While keys are still being embedded the encoder may be loading; don't wait on it
+        for key, semantic, lexical in (self.search(command) if self.semantic_ready() else []):
+            if semantic >= self.semantic_threshold or lexical >= threshold:
+                return self.answers.get(key)
+        # Semantic miss: typo tolerance over keys that share a word prefix, not the whole memory
+        match = process.extractOne(command, self.lexical_candidates(command), scorer=fuzz.ratio,
+                                   score_cutoff=threshold)
+        if match:
+            return self.answers.get(match[0])
+        return None
@@ -0,0 +1,146 @@
+import datetime
+import json
+import os
+import threading
+from action_catalog import ACTION_CATALOG_PATH, build_catalog, load_catalog, save_catalog
+from bandit import BANDIT_MODEL_PATH, SoftmaxPolicy
+from cached_store import write_json_atomic
+from tracing import tracer
+
+MODEL_PATH = "alen_rl_model.zip"
+MODEL_VERSION_PATH = "alen_rl_model.version.json"
+ENCODER_NAME = "multi-qa-MiniLM-L6-cos-v1"
+
+
+def read_model_version(version_path=MODEL_VERSION_PATH):
+    try:
+        with open(version_path, "r") as f:
+            return json.load(f).get("version", 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def publish_model(model, actions, model_path=MODEL_PATH, version_path=MODEL_VERSION_PATH,
+                  catalog_path=ACTION_CATALOG_PATH):
+    """Publish a trained policy with its action catalog, then bump the version.
+
+    The catalog goes first: it only ever grows, so an older policy stays
+    valid against it, while a new policy is never visible without it.
+    """
+    version = read_model_version(version_path) + 1
+    save_catalog(actions, catalog_path, version=version)
+
+    root, ext = os.path.splitext(model_path)
+    tmp_path = f"{root}.tmp{ext}"
+    model.save(tmp_path)
+    os.replace(tmp_path, model_path)
+
+    write_json_atomic(version_path, {"version": version, "published": datetime.datetime.now().isoformat()})
+    return version
+
+
+class ModelRegistry:
+    """Process-wide holder for the RL policy and sentence encoder.
+
+    Both are loaded once. The policy files (PPO zip and bandit npz) are
+    watched by mtime/size and the most recently published one is served;
+    a newer one is loaded on a background thread, then swapped in with a
+    single reference assignment so in-flight predictions keep the old one.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, encoder_name=ENCODER_NAME, device="cpu",
+                 version_path=MODEL_VERSION_PATH, catalog_path=ACTION_CATALOG_PATH,
+                 bandit_path=BANDIT_MODEL_PATH):
+        self.model_path = model_path
+        self.bandit_path = bandit_path
+        self.version_path = version_path
+        self.catalog_path = catalog_path
+        self.version = None
+        self.encoder_name = encoder_name
+        self.device = device
+        self._policy = None  # (stamp, model, actions)
+        self._encoder = None
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    def _stamp(self):
+        newest = None
+        for path in (self.model_path, self.bandit_path):
+            try:
+                st = os.stat(path)
+            except (OSError, TypeError):
+                continue
+            if newest is None or st.st_mtime_ns > newest[1]:
+                newest = (path, st.st_mtime_ns, st.st_size)
+        return newest
+
+    def get_encoder(self):
+        if self._encoder is None:
+            with self._lock:
+                if self._encoder is None:
+                    from sentence_transformers import SentenceTransformer
+                    with tracer.span("encoder_load"):
+                        self._encoder = SentenceTransformer(self.encoder_name, device=self.device)
+        return self._encoder
+
+    def _load_actions(self):
+        actions = load_catalog(self.catalog_path)
+        if not actions:
+            # Policy from before catalogs existed: freeze one from the log once
+            from interaction_store import default_store
+            actions = build_catalog(default_store)
+            save_catalog(actions, self.catalog_path, version=read_model_version(self.version_path))
+        return actions
+
+    def _load_policy(self, stamp):
+        path = stamp[0]
+        if path.endswith(".npz"):
+            with tracer.span("bandit_load"):
+                model = SoftmaxPolicy.load(path)
+        else:
+            from stable_baselines3 import PPO
+            with tracer.span("ppo_load"):
+                model = PPO.load(path, device=self.device)
+        actions = self._load_actions()
+        self._policy = (stamp, model, actions)
+        self.version = read_model_version(self.version_path)
+        return self._policy
+
+    def _reload_in_background(self, stamp):
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+
+        def reload():
+            try:
+                self._load_policy(stamp)
+                print("🔁 Reloaded RL model from disk")
+            except Exception as e:
+                # Probably caught the file mid-write; retry on a later call
+                print(f"RL model reload failed: {e}")
+            finally:
+                self._reloading = False
+
+        threading.Thread(target=reload, daemon=True).start()
+
+    def get_snapshot(self):
+        """Return (policy, actions) from one publish, or (None, None) if untrained."""
+        stamp = self._stamp()
+        current = self._policy
+        if current is None:
+            if stamp is None:
+                return None, None  # Model hasn't been trained yet
+            with self._lock:
+                current = self._policy
+                if current is None:
+                    current = self._load_policy(stamp)
+        elif stamp is not None and stamp != current[0]:
+            self._reload_in_background(stamp)
+        return current[1], current[2]
+
+    def get_policy(self):
+        return self.get_snapshot()[0]
+
+
+registry = ModelRegistry()
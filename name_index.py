@@ -0,0 +1,72 @@
+from bisect import bisect_left
+from rapidfuzz import fuzz, process
+
+MIN_PREFIX_LENGTH = 3
+MAX_FAST_CANDIDATES = 64  # Ranked before the caller's limit is applied
+
+
+def normalize_name(text):
+    return " ".join(text.lower().split())
+
+
+class NameIndex:
+    """Resident name -> path lookup for app and folder resolution.
+
+    Lookups try exact, prefix (bisect over sorted names) and whole-token
+    matches first, ranked together so a whole-word hit ("google chrome"
+    for "chrome") beats a name that merely starts with the query
+    ("chromedriver"). Only when those find nothing does rapidfuzz score
+    every preprocessed name.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.paths = {normalize_name(name): path for name, path in mapping.items()}
+        self.names = sorted(self.paths)
+        self.tokens = {}
+        for name in self.names:
+            for token in set(name.split()):
+                self.tokens.setdefault(token, []).append(name)
+
+    def _prefix_matches(self, query):
+        matches = []
+        i = bisect_left(self.names, query)
+        while i < len(self.names) and self.names[i].startswith(query) and len(matches) < MAX_FAST_CANDIDATES:
+            name = self.names[i]
+            matches.append((name, 80 + 10 * len(query) / len(name)))
+            i += 1
+        return matches
+
+    def _token_matches(self, query):
+        tokens = query.split()
+        pools = [self.tokens.get(token) for token in tokens]
+        if not tokens or not all(pools):
+            return []
+        common = set(min(pools, key=len)).intersection(*map(set, pools))
+        ranked = sorted(common, key=lambda name: (len(name), name))[:MAX_FAST_CANDIDATES]
+        return [(name, 90 + 10 * len(query) / len(name)) for name in ranked]
+
+    def candidates(self, query, limit=5, threshold=75):
+        """Return up to `limit` (name, score, path) tuples, best first."""
+        query = normalize_name(query)
+        if not query:
+            return []
+        if query in self.paths:
+            return [(query, 100.0, self.paths[query])]
+
+        scores = {}
+        prefix_matches = self._prefix_matches(query) if len(query) >= MIN_PREFIX_LENGTH else []
+        for name, score in prefix_matches + self._token_matches(query):
+            scores[name] = max(score, scores.get(name, 0))
+        matches = list(scores.items())
+        if not matches:
+            matches = [(name, score) for name, score, _ in
+                       process.extract(query, self.names, scorer=fuzz.WRatio, processor=None,
+                                       limit=limit, score_cutoff=threshold)]
+        matches = [(name, score) for name, score in matches if score >= threshold]
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return [(name, score, self.paths[name]) for name, score in matches[:limit]]
+
+    def best(self, query, threshold=75):
+        matches = self.candidates(query, limit=1, threshold=threshold)
+        return matches[0][2] if matches else None
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from cached_store import get_store
+
+SEARCH_URL = os.environ.get("ALEN_SEARCH_URL", "https://api.duckduckgo.com/")
+SEARCH_CACHE_FILE = "search_cache.json"
+NO_ANSWER = "Sorry, I couldn't find anything useful."
+
+
+def trim_response(text):
+    # Split by full stops
+    sentences = text.split('.')
+    # Take first 2 non-empty sentences
+    short_sentences = [s.strip() for s in sentences if s.strip()]
+    short_text = '. '.join(short_sentences[:2])
+    return short_text + '.' if short_text else NO_ANSWER
+
+
+def extract_answer(data):
+    for key in ["Answer", "Definition", "Abstract"]:
+        if data.get(key):
+            return trim_response(data[key])
+
+    for topic in data.get("RelatedTopics", []):
+        if isinstance(topic, dict) and "Text" in topic:
+            return trim_response(topic["Text"])
+
+    return NO_ANSWER
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+class SearchClient:
+    """DuckDuckGo instant-answer client with a pooled session and an LRU+TTL cache.
+
+    Empty answers are cached too, for `negative_ttl` seconds. Point
+    `base_url` (or ALEN_SEARCH_URL) at a local stub server for tests.
+    """
+
+    def __init__(self, base_url=SEARCH_URL, cache_path=SEARCH_CACHE_FILE, max_entries=500,
+                 ttl=24 * 3600, negative_ttl=600, timeout=5, pool_size=8):
+        self.base_url = base_url
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._store = get_store(cache_path) if cache_path else None
+        self._cache = OrderedDict(self._store.load() if self._store else {})
+        self._lock = threading.Lock()
+        self._session = None
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+        self.last_upstream_seconds = None
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+            self._session = session
+        return self._session
+
+    def warm_up(self):
+        self._get_session()
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry["expires"] < time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry["answer"]
+
+    def _remember(self, key, answer):
+        ttl = self.negative_ttl if answer == NO_ANSWER else self.ttl
+        with self._lock:
+            self._cache[key] = {"answer": answer, "expires": time.time() + ttl}
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            snapshot = dict(self._cache)
+        if self._store:
+            self._store.save(snapshot)
+
+    def _fetch(self, query):
+        params = {
+            "q": query,
+            "format": "json",
+            "no_redirect": 1,
+            "no_html": 1,
+            "skip_disambig": 1
+        }
+        start = time.perf_counter()
+        try:
+            response = self._get_session().get(self.base_url, params=params, timeout=self.timeout)
+            return response.json()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.upstream_calls += 1
+                self.upstream_seconds += elapsed
+                self.last_upstream_seconds = elapsed
+
+    def search(self, query):
+        import requests
+        key = normalize_query(query)
+        answer = self._cached(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+        self.misses += 1
+        try:
+            answer = extract_answer(self._fetch(query))
+        except requests.exceptions.Timeout:
+            return "DuckDuckGo search timed out. Check your internet connection."
+        except Exception as e:
+            return f"Search error: {str(e)}"
+        self._remember(key, answer)
+        return answer
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        if self._store:
+            self._store.save({})
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._cache),
+            "upstream_calls": self.upstream_calls,
+            "upstream_avg_seconds": self.upstream_seconds / self.upstream_calls if self.upstream_calls else 0.0,
+            "upstream_last_seconds": self.last_upstream_seconds,
+        }
+
+
+default_client = SearchClient()
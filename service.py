@@ -0,0 +1,188 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from alen_backend import build_pipeline, log_interaction, model_registry, warm_up
+from tracing import tracer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 64
+MAX_BODY_BYTES = 1 << 20
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ALENService:
+    """Headless HTTP front end for one shared AnswerPipeline.
+
+    POST /query {"text": ...} and POST /batch {"queries": [...]} return the
+    answer, its source and per-stage timings; GET /health reports status
+    and GET /metrics serves the tracer's Prometheus text. Binds to
+    localhost by default, and OS actions (launching apps, shutdown, volume) are
+    resolved but not performed unless `allow_os_actions` is set.
+    """
+
+    def __init__(self, pipeline=None, host=DEFAULT_HOST, port=DEFAULT_PORT, allow_os_actions=False,
+                 log_interactions=False, batch_workers=4):
+        self.pipeline = pipeline or build_pipeline(allow_os_actions=allow_os_actions)
+        self.log_interactions = log_interactions
+        self.started = time.time()
+        self._batch_pool = ThreadPoolExecutor(max_workers=batch_workers, thread_name_prefix="alen-batch")
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.service = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def answer(self, text):
+        text = text.strip().lower()
+        with tracer.request("http") as trace:
+            result = self.pipeline.answer(text)
+            trace.source = result["source"]
+            if self.log_interactions:
+                log_interaction(text, result["response"], 0)
+        return dict(result, query=text)
+
+    def answer_batch(self, texts):
+        return list(self._batch_pool.map(self.answer, texts))
+
+    def health(self):
+        return {
+            "status": "ok",
+            "uptime": time.time() - self.started,
+            "model_version": model_registry.version,
+            "log_interactions": self.log_interactions,
+        }
+
+    def start(self):
+        """Serve on a daemon thread (for scripts and tests)."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="alen-service")
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._batch_pool.shutdown(wait=False)
+        self.pipeline.close()
+
+
+def _text_field(value):
+    if not isinstance(value, str) or not value.strip():
+        raise ServiceError(400, "each query must be a non-empty string")
+    return value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so load tests do not pay a connect per request
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")  # Tell keep-alive clients to reconnect
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False))
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise ServiceError(400, "invalid Content-Length")
+        if length < 0:
+            raise ServiceError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(413, "request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ServiceError(400, "body must be JSON")
+        if not isinstance(body, dict):
+            raise ServiceError(400, "body must be a JSON object")
+        return body
+
+    def _handle(self, route):
+        try:
+            route()
+        except ServiceError as e:
+            self.close_connection = True  # The body may not have been read
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"internal error: {e}"})
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._handle(lambda: self._send_json(200, service.health()))
+        elif self.path == "/metrics":
+            self._handle(lambda: self._send(200, tracer.prometheus_text(), "text/plain; version=0.0.4"))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        service = self.server.service
+        if self.path == "/query":
+            def route():
+                body = self._read_json()
+                self._send_json(200, service.answer(_text_field(body.get("text"))))
+        elif self.path == "/batch":
+            def route():
+                queries = self._read_json().get("queries")
+                if not isinstance(queries, list) or not queries:
+                    raise ServiceError(400, "queries must be a non-empty list")
+                if len(queries) > MAX_BATCH:
+                    raise ServiceError(413, f"at most {MAX_BATCH} queries per batch")
+                texts = [_text_field(query) for query in queries]
+                self._send_json(200, {"results": service.answer_batch(texts)})
+        else:
+            self.close_connection = True  # The body was not read, so the connection can't be reused
+            self._send_json(404, {"error": "not found"})
+            return
+        self._handle(route)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ALEN as a local HTTP service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--allow-os-actions", action="store_true",
+                        help="actually open apps, shut down, change volume, ...")
+    parser.add_argument("--log-interactions", action="store_true", help="append answers to the training log")
+    args = parser.parse_args()
+
+    warm_up()
+    service = ALENService(host=args.host, port=args.port, allow_os_actions=args.allow_os_actions,
+                          log_interactions=args.log_interactions)
+    print(f"🌐 ALEN service listening on {service.url}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
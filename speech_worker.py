@@ -0,0 +1,163 @@
+import hashlib
+import itertools
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2  # Cache synthesis, only when nothing is waiting to be spoken
+TTS_CACHE_DIR = "tts_cache"
+MAX_CACHE_FILES = 500
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+MAX_SPOKEN_COUNTS = 1000  # Texts remembered for the cache_after threshold
+
+
+class SpeechWorker:
+    """One long-lived text-to-speech thread fed by a priority queue.
+
+    The pyttsx3 engine is created once on the worker thread. Texts marked
+    cacheable, or spoken `cache_after` times, are rendered to WAV in
+    the background. Later requests play that file directly, which starts
+    faster than live synthesis. The cache keeps the most recently played
+    files within `max_cache_files` and `max_cache_bytes`.
+    """
+
+    def __init__(self, get_rate=lambda: 180, cache_dir=TTS_CACHE_DIR, cache_after=2,
+                 max_cache_files=MAX_CACHE_FILES, max_cache_bytes=MAX_CACHE_BYTES,
+                 max_spoken_counts=MAX_SPOKEN_COUNTS):
+        self.get_rate = get_rate
+        self.cache_dir = cache_dir
+        self.cache_after = cache_after
+        self.max_cache_files = max_cache_files
+        self.max_cache_bytes = max_cache_bytes
+        self.max_spoken_counts = max_spoken_counts
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._engine = None
+        self._rate = None
+        self._generation = 0
+        self._spoken_counts = OrderedDict()  # LRU: least recently spoken first
+        self._playing_cached = False
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def say(self, text, priority=PRIORITY_NORMAL, cache=False, interrupt=False):
+        if interrupt:
+            self.interrupt()
+        self.start()
+        self._queue.put((priority, next(self._seq), "say", text, cache, self._generation))
+
+    def interrupt(self):
+        # Drop everything queued so far and cut off the current utterance
+        self._generation += 1
+        if self._playing_cached:
+            import sounddevice as sd
+            sd.stop()
+        elif self._engine is not None:
+            self._engine.stop()
+
+    def _cache_path(self, text):
+        key = hashlib.sha1(f"{self._rate}:{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".wav")
+
+    def _get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+        rate = self.get_rate()
+        if rate != self._rate:
+            self._engine.setProperty('rate', rate)
+            self._rate = rate
+        return self._engine
+
+    def _run(self):
+        while True:
+            priority, _, kind, text, cache, generation = self._queue.get()
+            if generation != self._generation and kind == "say":
+                continue
+            try:
+                if kind == "say":
+                    self._speak(text, cache)
+                else:
+                    self._synthesize(text)
+            except Exception as e:
+                print(f"Speech failed: {e}")
+
+    def _speak(self, text, cache):
+        engine = self._get_engine()
+        path = self._cache_path(text)
+        if os.path.exists(path):
+            self._touch(path)
+            self._play(path)
+            return
+        engine.say(text)
+        engine.runAndWait()
+
+        count = self._count_spoken(text)
+        if cache or count >= self.cache_after:
+            self._queue.put((PRIORITY_BACKGROUND, next(self._seq), "synth", text, True, None))
+
+    def _synthesize(self, text):
+        engine = self._get_engine()
+        path = self._cache_path(text)
+        if os.path.exists(path):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp.wav"
+        engine.save_to_file(text, tmp_path)
+        engine.runAndWait()
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, path)
+            self._evict_cache()
+
+    def _count_spoken(self, text):
+        count = self._spoken_counts.pop(text, 0) + 1
+        self._spoken_counts[text] = count
+        while len(self._spoken_counts) > self.max_spoken_counts:
+            self._spoken_counts.popitem(last=False)
+        return count
+
+    def _touch(self, path):
+        # mtime doubles as last-played time for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict_cache(self):
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".wav") and not entry.name.endswith(".tmp.wav"):
+                    st = entry.stat()
+                    files.append((st.st_mtime, st.st_size, entry.path))
+        files.sort()  # Least recently played first
+        count, total = len(files), sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if count <= self.max_cache_files and total <= self.max_cache_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+    def _play(self, path):
+        import sounddevice as sd
+        import soundfile as sf
+        data, samplerate = sf.read(path, dtype="float32")
+        self._playing_cached = True
+        try:
+            sd.play(data, samplerate)
+            sd.wait()
+        finally:
+            self._playing_cached = False
@@ -0,0 +1,110 @@
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+
+_START = time.perf_counter()
+_marks = []
+_import_times = {}
+_lock = threading.Lock()
+_original_import = builtins.__import__
+
+REPORT_ENABLED = os.environ.get("ALEN_STARTUP_REPORT") == "1"
+
+
+def elapsed():
+    return time.perf_counter() - _START
+
+
+def mark(label):
+    with _lock:
+        _marks.append((label, elapsed()))
+
+
+def _record_import(name, seconds, lazy=False):
+    with _lock:
+        key = f"{name} (lazy)" if lazy else name
+        _import_times[key] = _import_times.get(key, 0.0) + seconds
+
+
+def _tracking_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only first-time absolute imports are timed; times are inclusive of children
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _record_import(name, time.perf_counter() - start)
+
+
+def track_imports():
+    builtins.__import__ = _tracking_import
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that performs the real import on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    _record_import(self.__name__, time.perf_counter() - start, lazy=True)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def warm_in_background(*loaders):
+    """Run loaders (LazyModules or callables) on a daemon thread, in order."""
+    def warm():
+        for loader in loaders:
+            try:
+                loader._load() if isinstance(loader, LazyModule) else loader()
+            except Exception as e:
+                print(f"Background warm-up failed for {loader}: {e}")
+        mark("background warm-up done")
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+
+def report(top=15):
+    with _lock:
+        marks = list(_marks)
+        imports = sorted(_import_times.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"marks": marks, "imports": imports}
+
+
+def print_report(top=15):
+    data = report(top)
+    print("⏱ Startup report")
+    for label, at in data["marks"]:
+        print(f"  {at * 1000:8.1f} ms  {label}")
+    if data["imports"]:
+        print("  Slowest imports (inclusive):")
+        for name, seconds in data["imports"]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+
+if REPORT_ENABLED:
+    track_imports()
@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+import pytest
+
+from action_catalog import policy_size
+from alen_env import ALENEnv, EmptyDatasetError
+
+
+class ZeroCache:
+    def encode(self, texts):
+        return np.zeros((len(texts), 384) if isinstance(texts, list) else 384, dtype=np.float32)
+
+
+RECORDS = [{"state": "hi", "action": "Hello!", "reward": 0}, {"state": "bye", "action": "Goodbye!", "reward": 1}]
+
+
+def test_json_dataset_is_read_as_an_array(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("export.json", "w") as f:
+        json.dump(RECORDS, f, indent=4)
+    env = ALENEnv(dataset_path="export.json", embedding_cache=ZeroCache(), actions=["Hello!", "Goodbye!"])
+    assert env.data == RECORDS
+    assert not (tmp_path / "export.jsonl").exists()
+
+
+def test_reading_the_log_never_migrates_the_legacy_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("interaction_dataset.json", "w") as f:
+        json.dump(RECORDS, f)
+    env = ALENEnv(dataset_path="interaction_dataset.jsonl", embedding_cache=ZeroCache(), actions=[])
+    assert env.data == []
+    assert not (tmp_path / "interaction_dataset.jsonl").exists()
+
+
+def test_compact_table_of_disliked_pairs_is_not_trained_on(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    aggregate = {"state": "joke", "action": "Bad joke", "count": 3, "reward_sum": -2, "feedback": 2,
+                 "first_seen": None, "last_seen": None}
+    with open("table.json", "w") as f:
+        json.dump({"source": None, "offset": 0, "events": 3, "aggregates": [aggregate]}, f)
+    with pytest.raises(EmptyDatasetError):
+        ALENEnv(dataset_path="table.json", embedding_cache=ZeroCache(), actions=["Bad joke"], compact=True)
+
+
+def test_action_space_covers_the_whole_catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    actions = [f"reply {i}" for i in range(91)]
+    env = ALENEnv(dataset_path=None, embedding_cache=ZeroCache(), actions=actions)
+    assert env.action_space.n == 128
+    assert [policy_size(n) for n in (0, 16, 17, 128, 129)] == [16, 16, 32, 128, 256]
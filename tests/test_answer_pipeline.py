@@ -0,0 +1,56 @@
+from answer_pipeline import AnswerPipeline
+from search_client import NO_ANSWER
+
+
+def _pipeline(memory, pc_command, searched, **kwargs):
+    def search(text):
+        searched.append(text)
+        return "From the web."
+    return AnswerPipeline(memory, pc_command, search, lambda text: None, **kwargs)
+
+
+def _fail(text):
+    raise RuntimeError("broken stage")
+
+
+def test_failing_memory_and_command_fall_through_to_search():
+    searched = []
+    pipeline = _pipeline(_fail, _fail, searched)
+    try:
+        result = pipeline.answer("what is python")
+    finally:
+        pipeline.close()
+    assert result["source"] == "search"
+    assert result["response"] == "From the web."
+
+
+def test_memory_hits_and_commands_are_never_searched():
+    searched = []
+    pipeline = _pipeline(lambda text: "Hi!" if text == "hello" else None,
+                         lambda text: "Shutting down the system." if text == "shutdown" else None, searched)
+    try:
+        assert pipeline.answer("hello")["source"] == "memory"
+        assert pipeline.answer("shutdown")["source"] == "command"
+    finally:
+        pipeline.close()
+    assert searched == []
+
+
+def test_speculative_search_waits_for_memory_miss():
+    searched = []
+    pipeline = _pipeline(lambda text: "Hi!" if text == "hello" else None, lambda text: None, searched,
+                         speculative=True)
+    try:
+        assert pipeline.answer("hello")["source"] == "memory"
+        assert pipeline.answer("unknown")["source"] == "search"
+    finally:
+        pipeline.close()
+    assert searched == ["unknown"]
+
+
+def test_no_source_answers():
+    pipeline = AnswerPipeline(lambda t: None, lambda t: None, lambda t: NO_ANSWER, lambda t: None)
+    try:
+        assert pipeline.answer("anything")["source"] == "none"
+    finally:
+        pipeline.close()
@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+
+import pytest
+
+import cached_store
+from action_catalog import load_catalog, save_catalog
+from cached_store import CachedJSONFile
+
+
+def test_load_returns_a_private_copy(tmp_path):
+    store = CachedJSONFile(str(tmp_path / "memory.json"))
+    store.save({"hi": "Hello!", "nested": {"a": 1}})
+    data = store.load()
+    data["hi"] = "changed"
+    data["nested"]["a"] = 2
+    assert store.load() == {"hi": "Hello!", "nested": {"a": 1}}
+
+
+def test_view_is_read_only_and_stable(tmp_path):
+    store = CachedJSONFile(str(tmp_path / "memory.json"))
+    store.save({"hi": "Hello!"})
+    view = store.view()
+    assert store.view() is view
+    with pytest.raises(TypeError):
+        view["hi"] = "changed"
+    store.save({"hi": "Hey"})
+    assert store.view() is not view and store.view()["hi"] == "Hey"
+
+
+def test_failed_save_keeps_cached_data(tmp_path, monkeypatch):
+    store = CachedJSONFile(str(tmp_path / "memory.json"))
+    store.save({"hi": "Hello!"})
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cached_store.os, "replace", fail)
+    with pytest.raises(OSError):
+        store.save({"hi": "lost"})
+    assert store.load() == {"hi": "Hello!"}
+    assert [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")] == []
+
+
+def test_concurrent_catalog_writers_never_share_a_temp_file(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    errors = []
+
+    def writer(name):
+        try:
+            for i in range(50):
+                save_catalog([f"{name} {i}"], path, version=i)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(name,)) for name in ("app", "trainer")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert load_catalog(path)[0].endswith(" 49")
+    assert os.listdir(tmp_path) == ["catalog.json"]
+    with open(path) as f:
+        assert json.load(f)["version"] == 49
@@ -0,0 +1,37 @@
+from chat_view import ChatHistory, ChatView
+
+
+class FakeText:
+    """Records what a Tk Text widget would show, in order."""
+
+    def __init__(self):
+        self.content = []
+
+    def insert(self, index, chunk, *tags):
+        self.content.append(chunk)
+
+    def window_create(self, index, window):
+        self.content.append(window)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class FakeWidget:
+    def __init__(self, parent, label):
+        self.parent = parent
+        self.label = label
+
+
+def test_widget_is_built_with_its_own_message(tmp_path):
+    view = ChatView(FakeText(), ChatHistory(str(tmp_path)))
+    view.add_message("You", "hi")
+    index = view.add_message("ALEN", "Hello!", lambda parent: FakeWidget(parent, "feedback"))
+    view.add_message("You", "thanks")
+
+    assert index == 1
+    assert [w.label for w in view._widgets[index]] == ["feedback"]
+    content = view.text.content
+    reply = next(i for i, chunk in enumerate(content) if "Hello!" in str(chunk))
+    assert content[reply + 1] is view._widgets[index][0]
+    assert "thanks" in content[reply + 3]
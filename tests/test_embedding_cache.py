@@ -0,0 +1,49 @@
+import numpy as np
+
+from embedding_cache import EmbeddingCache, text_key
+
+DIM = 4
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text)] * DIM for text in texts], dtype=np.float32)
+
+
+def _cache(prefix, encoder=None):
+    return EmbeddingCache(prefix=str(prefix), dim=DIM, encoder=encoder or FakeEncoder())
+
+
+def test_append_truncates_a_torn_row(tmp_path):
+    cache = _cache(tmp_path / "emb")
+    cache.encode(["ab"])
+    with open(cache.data_path, "ab") as f:
+        f.write(b"\x00" * 6)  # Crash mid-row
+    assert cache.encode("abcde").tolist() == [5.0] * DIM
+    assert cache.encode("ab").tolist() == [2.0] * DIM
+    assert len(_cache(tmp_path / "emb")) == 2
+
+
+def test_index_entry_waits_for_its_row(tmp_path):
+    cache = _cache(tmp_path / "emb")
+    cache.encode(["ab"])
+    with open(cache.index_path, "a", encoding="ascii") as f:
+        f.write("ffff 1\n")  # Written ahead of its row
+    assert len(cache) == 1
+    with open(cache.data_path, "ab") as f:
+        f.write(np.full(DIM, 7, dtype=np.float32).tobytes())
+    assert len(cache) == 2
+
+
+def test_append_skips_rows_another_writer_stored(tmp_path):
+    first, second = _cache(tmp_path / "emb"), _cache(tmp_path / "emb")
+    first.encode(["ab", "cd"])
+    # `second` encoded "ab" before seeing first's rows; only "xyz" is new
+    second._append([text_key("ab"), text_key("xyz")], np.array([[9] * DIM, [3] * DIM]))
+    assert second._available_rows() == 3
+    assert second.encode("xyz").tolist() == [3.0] * DIM
+    assert first.encode("ab").tolist() == [2.0] * DIM
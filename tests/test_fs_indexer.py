@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+from cached_store import CachedJSONFile
+from fs_indexer import BackgroundIndex, DirectoryIndexer
+
+
+def _match_folder(name, is_dir):
+    return name.lower() if is_dir else None
+
+
+def _make_dirs(root, *paths):
+    for path in paths:
+        os.makedirs(os.path.join(root, path))
+
+
+def test_root_depths_limit_individual_roots(tmp_path):
+    drive, home = str(tmp_path / "drive"), str(tmp_path / "home")
+    _make_dirs(drive, os.path.join("Program Files", "Google", "Chrome"), "Projects")
+    _make_dirs(home, os.path.join("Documents", "Taxes", "2024"))
+
+    indexer = DirectoryIndexer([home, drive], _match_folder, max_depth=2, root_depths={drive: 0})
+    index = indexer.scan()
+
+    assert "projects" in index and "program files" in index
+    assert "google" not in index and "chrome" not in index
+    assert index["2024"] == os.path.join(home, "Documents", "Taxes", "2024")
+
+
+def test_excludes_skip_install_trees(tmp_path):
+    root = str(tmp_path)
+    _make_dirs(root, os.path.join("Program Files (x86)", "Chrome"), os.path.join("Music", "Chrome"))
+
+    index = DirectoryIndexer([root], _match_folder, max_depth=2, exclude=["program files*"]).scan()
+
+    assert index["chrome"] == os.path.join(root, "Music", "Chrome")
+    assert "program files (x86)" not in index
+
+
+def test_saved_state_is_dropped_when_settings_change(tmp_path):
+    root, state = str(tmp_path / "drive"), str(tmp_path / "state.json")
+    _make_dirs(root, os.path.join("Program Files", "Google", "Chrome"), "Projects")
+
+    first = DirectoryIndexer([root], _match_folder, max_depth=2, state_path=state).scan()
+    assert "chrome" in first
+
+    rescan = DirectoryIndexer([root], _match_folder, max_depth=2, state_path=state, exclude=["program files*"])
+    index = rescan.scan()
+    assert set(index) == {"projects"}
+    assert rescan.last_scan["reused"] == 0
+
+    again = DirectoryIndexer([root], _match_folder, max_depth=2, state_path=state, exclude=["program files*"])
+    assert again.scan() == index and again.last_scan["listed"] == 0
+
+
+def test_refresh_does_not_wait_for_a_running_scan(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    class SlowIndexer:
+        def scan(self):
+            started.set()
+            release.wait(5)
+            return {"chrome": "C:\\Chrome"}
+
+    index = BackgroundIndex(SlowIndexer(), CachedJSONFile(str(tmp_path / "index.json")))
+    assert index.refresh()
+    started.wait(5)
+    begin = time.perf_counter()
+    assert not index.refresh()  # Already running: returns at once instead of queueing a second scan
+    assert time.perf_counter() - begin < 0.5
+    release.set()
+    index._thread.join(5)
+    assert dict(index.load()) == {"chrome": "C:\\Chrome"}
@@ -0,0 +1,71 @@
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+from memory_index import MAX_LEXICAL_CANDIDATES, SemanticMemoryIndex
+
+
+class HashEncoder:
+    """Unrelated random unit vectors, so only the lexical fallback can match typos."""
+
+    def encode(self, texts):
+        out = []
+        for text in texts:
+            seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).standard_normal(384)
+            out.append(vector / np.linalg.norm(vector))
+        return np.array(out, dtype=np.float32)
+
+
+def _index(tmp_path, memory):
+    index = SemanticMemoryIndex(EmbeddingCache(prefix=str(tmp_path / "emb"), encoder=HashEncoder()))
+    index.sync(memory)
+    return index
+
+
+def test_typo_falls_back_to_a_bounded_pool(tmp_path):
+    memory = {f"the filler number {i}": "filler" for i in range(2000)}
+    memory["open the pod bay doors"] = "I'm sorry, Dave."
+    index = _index(tmp_path, memory)
+    assert index.lookup("open the pod bay dors") == "I'm sorry, Dave."
+    assert len(index.lexical_candidates("the filler numbr 7")) <= MAX_LEXICAL_CANDIDATES
+    assert index.lookup("completely unrelated words") is None
+
+
+def test_removed_keys_leave_the_prefix_index(tmp_path):
+    index = _index(tmp_path, {"open the pod bay doors": "no", "hello there": "hi"})
+    index.sync({"hello there": "hi"})
+    assert index.lexical_candidates("open pod doors") == []
+    assert index.lookup("helo there") == "hi"
+
+
+class SlowEncoder(HashEncoder):
+    """Blocks like a cold SentenceTransformer until `loaded` is set."""
+
+    def __init__(self):
+        self.loaded = threading.Event()
+
+    def encode(self, texts):
+        assert self.loaded.wait(5)
+        return super().encode(texts)
+
+
+def test_known_answers_do_not_wait_for_the_encoder(tmp_path):
+    encoder = SlowEncoder()
+    index = SemanticMemoryIndex(EmbeddingCache(prefix=str(tmp_path / "emb"), encoder=encoder))
+    begin = time.perf_counter()
+    index.sync({"hi": "Hello!", "open the pod bay doors": "I'm sorry, Dave."}, version=1, background=True)
+    assert index.lookup("hi") == "Hello!"
+    assert index.lookup("open the pod bay dors") == "I'm sorry, Dave."
+    assert index.lookup("something else entirely") is None
+    assert time.perf_counter() - begin < 1
+    assert not index.semantic_ready()
+
+    encoder.loaded.set()
+    assert index.wait_embedded(5)
+    assert sorted(index.keys) == ["hi", "open the pod bay doors"]
+    index.sync({"hi": "Hey!"}, version=2)
+    assert index.keys == ["hi"] and index.lookup("hi") == "Hey!"
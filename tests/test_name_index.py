@@ -0,0 +1,23 @@
+from name_index import NameIndex
+
+APPS = {
+    "google chrome": "C:\\Apps\\Google Chrome.lnk",
+    "chromedriver": "C:\\Tools\\chromedriver.exe",
+    "visual studio code": "C:\\Apps\\Visual Studio Code.lnk",
+    "notepad": "C:\\Windows\\notepad.exe",
+}
+
+
+def test_whole_word_match_beats_a_longer_prefix():
+    index = NameIndex(APPS)
+    assert index.best("chrome") == APPS["google chrome"]
+    assert [name for name, _, _ in index.candidates("chrome")] == ["google chrome", "chromedriver"]
+
+
+def test_exact_prefix_and_fuzzy_matches():
+    index = NameIndex(APPS)
+    assert index.candidates("Notepad") == [("notepad", 100.0, APPS["notepad"])]
+    assert index.best("chromedr") == APPS["chromedriver"]
+    assert index.best("visual studio") == APPS["visual studio code"]
+    assert index.best("notpad") == APPS["notepad"]
+    assert index.best("spotify") is None
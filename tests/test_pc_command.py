@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import alen_backend
+import startup
+
+
+@pytest.fixture
+def headless(tmp_path, monkeypatch):
+    # No os.startfile (not Windows) and no importable pyautogui (no display)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delattr(os, "startfile", raising=False)
+    monkeypatch.setitem(sys.modules, "pyautogui", None)
+    monkeypatch.setattr(alen_backend, "pyautogui", startup.lazy_import("pyautogui"))
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("dry run touched the OS")
+
+    monkeypatch.setattr(subprocess, "call", forbidden)
+    monkeypatch.setattr(os, "system", forbidden)
+    with open("app_index.json", "w") as f:
+        json.dump({"chrome": "C:/Apps/chrome.exe"}, f)
+    with open("folder_index.json", "w") as f:
+        json.dump({}, f)
+
+
+@pytest.mark.parametrize("command, reply", [
+    ("open chrome", "Opening Chrome."),
+    ("mute", "Muting volume."),
+    ("increase volume", "Increasing volume."),
+    ("decrease volume", "Decreasing volume."),
+    ("shutdown", "Shutting down the system."),
+    ("lock", "Locking the system."),
+])
+def test_dry_run_resolves_without_os_access(headless, command, reply):
+    assert alen_backend.handle_pc_command(command, dry_run=True) == reply
+
+
+def test_dry_run_pipeline_answers_commands(headless):
+    pipeline = alen_backend.build_pipeline(allow_os_actions=False, is_online=lambda: False)
+    try:
+        result = pipeline.answer("mute")
+    finally:
+        pipeline.close()
+    assert result["source"] == "command"
+    assert result["response"] == "Muting volume."
+
+
+@pytest.fixture
+def launcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    opened = []
+    monkeypatch.setattr(os, "startfile", opened.append, raising=False)
+    folders = {}
+    for name in ("chrome backups", "music"):
+        path = tmp_path / name
+        path.mkdir()
+        folders[name] = str(path)
+    with open("folder_index.json", "w") as f:
+        json.dump(folders, f)
+    with open("app_index.json", "w") as f:
+        json.dump({"chrome": "C:/Apps/chrome.exe"}, f)
+    return opened, folders
+
+
+def test_app_beats_fuzzy_folder_match(launcher):
+    opened, _ = launcher
+    assert alen_backend.handle_pc_command("open chrome") == "Opening Chrome."
+    assert opened == ["C:/Apps/chrome.exe"]
+
+
+def test_exact_folder_match_wins(launcher):
+    opened, folders = launcher
+    assert alen_backend.handle_pc_command("open music") == f"Opening folder: {folders['music']}"
+    assert opened == [folders["music"]]
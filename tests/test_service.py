@@ -0,0 +1,50 @@
+import http.client
+import json
+
+import pytest
+
+from service import ALENService
+
+
+class StubPipeline:
+    def answer(self, text):
+        return {"response": f"echo {text}", "source": "memory", "timings": {}}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def service():
+    service = ALENService(pipeline=StubPipeline(), port=0).start()
+    yield service
+    service.stop()
+
+
+def _connect(service):
+    host, port = service.server.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=5)
+
+
+def _post(conn, path, body, headers=None):
+    conn.request("POST", path, body=body, headers=headers or {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_unknown_post_path_does_not_poison_the_next_request(service):
+    conn = _connect(service)
+    status, body = _post(conn, "/nope", json.dumps({"text": "hi"}))
+    assert status == 404 and body == {"error": "not found"}
+    status, body = _post(conn, "/query", json.dumps({"text": "hi"}))  # Reconnects if the server closed
+    assert status == 200 and body["response"] == "echo hi"
+
+
+def test_bad_content_length_is_a_json_400(service):
+    conn = _connect(service)
+    conn.putrequest("POST", "/query")
+    conn.putheader("Content-Length", "abc")
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read()) == {"error": "invalid Content-Length"}
@@ -0,0 +1,26 @@
+import os
+
+from speech_worker import SpeechWorker
+
+
+def test_spoken_counts_keep_only_recent_texts(tmp_path):
+    worker = SpeechWorker(cache_dir=str(tmp_path), max_spoken_counts=2)
+    for text in ("a", "b", "a", "c"):
+        worker._count_spoken(text)
+    assert list(worker._spoken_counts.items()) == [("a", 2), ("c", 1)]
+
+
+def test_cache_evicts_least_recently_played(tmp_path):
+    worker = SpeechWorker(cache_dir=str(tmp_path), max_cache_files=2, max_cache_bytes=250)
+    for i, name in enumerate(("old", "mid", "new")):
+        path = tmp_path / f"{name}.wav"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "partial.tmp.wav").write_bytes(b"x" * 1000)
+    worker._evict_cache()
+    assert sorted(os.listdir(tmp_path)) == ["mid.wav", "new.wav", "partial.tmp.wav"]
+
+    worker.max_cache_bytes = 150
+    worker._touch(str(tmp_path / "mid.wav"))  # Played again, so "new" is now the oldest
+    worker._evict_cache()
+    assert sorted(os.listdir(tmp_path)) == ["mid.wav", "partial.tmp.wav"]
@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+import trainer
+from training_scheduler import TrainingScheduler
+
+
+def _row(state, action, reward):
+    return {"state": state, "action": action, "reward": reward, "timestamp": "2026-10-01T00:00:00"}
+
+
+def test_raw_weights_drop_every_row_of_a_disliked_pair():
+    data = [
+        _row("hi", "Hello!", 0), _row("hi", "Hello!", 1),
+        _row("joke", "Bad joke", 0), _row("Joke ", "Bad joke", -1),
+        _row("mixed", "Maybe", 1), _row("mixed", "Maybe", -1), _row("mixed", "Maybe", 0),
+    ]
+    weights = trainer._training_weights(SimpleNamespace(compact=False, data=data))
+    assert weights.tolist() == [1, 1, 0, 0, 1, 1, 1]
+
+
+def test_scheduler_compacts_only_when_asked():
+    assert "--compact" not in TrainingScheduler().command
+    assert TrainingScheduler(compact=True).command[-1] == "--compact"
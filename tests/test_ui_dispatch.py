@@ -0,0 +1,22 @@
+import threading
+
+from ui_dispatch import BoundedExecutor
+
+
+def test_failed_jobs_are_reported_and_free_their_slot(capsys):
+    errors, reported = [], threading.Event()
+
+    def on_error(exc):
+        errors.append(exc)
+        reported.set()
+
+    def fail():
+        raise RuntimeError("speaker unplugged")
+
+    workers = BoundedExecutor(max_workers=1, max_pending=1, on_error=on_error)
+    workers.submit(fail)
+    assert reported.wait(5)
+    assert [str(e) for e in errors] == ["speaker unplugged"]
+    assert "RuntimeError: speaker unplugged" in capsys.readouterr().err
+    assert workers.submit(lambda: 42).result(5) == 42
+    workers.shutdown(wait=True)
@@ -0,0 +1,282 @@
+import bisect
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+
+# *.prom -> Prometheus text file (rewritten each time), anything else -> JSONL (one snapshot per line)
+METRICS_FILE = os.environ.get("ALEN_METRICS_FILE")
+METRICS_INTERVAL = float(os.environ.get("ALEN_METRICS_INTERVAL", "60"))
+SLOW_REQUEST_SECONDS = float(os.environ.get("ALEN_SLOW_REQUEST_MS", "3000")) / 1000
+PROFILE_DIR = "profiles"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current = contextvars.ContextVar("alen_trace", default=None)
+
+
+def current():
+    return _current.get()
+
+
+class Histogram:
+    """Latency histogram in seconds with fixed, Prometheus-style buckets."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self):
+        total = 0
+        out = []
+        for count in self.counts:
+            total += count
+            out.append(total)
+        return out
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Trace:
+    """Spans recorded while answering one request, across the threads it uses."""
+
+    def __init__(self, kind, profile=False):
+        self.kind = kind
+        self.source = None
+        self.spans = []  # (name, offset, seconds)
+        self.started = time.perf_counter()
+        self.total = None
+        self.profiles = [] if profile else None
+        self._profiled_threads = set()
+        self._lock = threading.Lock()
+
+    def add(self, name, start, seconds):
+        with self._lock:
+            self.spans.append((name, start - self.started, seconds))
+
+    def start_profile(self):
+        # One profiler per thread; cProfile only sees the thread that enabled it
+        if self.profiles is None:
+            return None
+        ident = threading.get_ident()
+        with self._lock:
+            if ident in self._profiled_threads:
+                return None
+            self._profiled_threads.add(ident)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the request's profiler already covers every thread
+            with self._lock:
+                self._profiled_threads.discard(ident)
+            return None
+        return profile
+
+    def stop_profile(self, profile):
+        profile.disable()
+        with self._lock:
+            self._profiled_threads.discard(threading.get_ident())
+            self.profiles.append(profile)
+
+    def breakdown(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span[1])
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, _, seconds in spans)
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class Tracer:
+    """Per-stage and per-source latency histograms with optional exports.
+
+    `request()` opens a trace for one message, `span()` times a stage
+    inside it (or on its own, outside any request). Stage threads pick the
+    trace up through contextvars, so spans from the pipeline's executor
+    land in the right request.
+    """
+
+    def __init__(self, slow_threshold=SLOW_REQUEST_SECONDS, profile_dir=PROFILE_DIR):
+        self.slow_threshold = slow_threshold
+        self.profile_dir = profile_dir
+        self.stages = {}
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._profile_next = False
+        self._exporter = None
+        self._stop = threading.Event()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def span(self, name):
+        trace = _current.get()
+        profile = trace.start_profile() if trace is not None else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profile is not None:
+                trace.stop_profile(profile)
+            self.observe(name, seconds)
+            if trace is not None:
+                trace.add(name, start, seconds)
+
+    def profile_next(self):
+        """Capture a cProfile of the next request only."""
+        self._profile_next = True
+
+    @contextlib.contextmanager
+    def request(self, kind):
+        outer = _current.get()
+        if outer is not None:
+            # Nested call (e.g. a voice command handing off to process_message)
+            yield outer
+            return
+        with self._lock:
+            profile, self._profile_next = self._profile_next, False
+        trace = Trace(kind, profile)
+        token = _current.set(trace)
+        profiler = trace.start_profile()
+        try:
+            yield trace
+        finally:
+            trace.total = time.perf_counter() - trace.started
+            if profiler is not None:
+                trace.stop_profile(profiler)
+            _current.reset(token)
+            self._finish(trace)
+
+    def _finish(self, trace):
+        key = (trace.kind, trace.source or "none")
+        with self._lock:
+            histogram = self.requests.get(key)
+            if histogram is None:
+                histogram = self.requests[key] = Histogram()
+            histogram.observe(trace.total)
+        if trace.total >= self.slow_threshold:
+            print(f"🐢 Slow {trace.kind} request ({trace.total:.2f}s, {key[1]}): {trace.breakdown()}")
+        if trace.profiles:
+            self._save_profile(trace)
+
+    def _save_profile(self, trace):
+        out = io.StringIO()
+        stats = pstats.Stats(trace.profiles[0], stream=out)
+        for profile in trace.profiles[1:]:
+            stats.add(profile)
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.profile_dir, f"request-{stamp}-{trace.kind}.prof")
+        stats.dump_stats(path)
+        stats.sort_stats("cumulative").print_stats(15)
+        print(f"🔬 Profile saved to {path} ({len(trace.profiles)} thread(s))")
+        print(out.getvalue())
+        return path
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: h.to_dict() for name, h in self.stages.items()}
+            requests = {f"{kind}/{source}": h.to_dict() for (kind, source), h in self.requests.items()}
+        return {"time": datetime.datetime.now().isoformat(), "stages": stages, "requests": requests}
+
+    def prometheus_text(self):
+        lines = []
+
+        def histogram_lines(metric, labels, histogram):
+            label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+            bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, histogram.cumulative()):
+                lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum{{{label_text}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{label_text}}} {histogram.count}")
+
+        with self._lock:
+            lines.append("# HELP alen_stage_seconds Time spent in each answer stage.")
+            lines.append("# TYPE alen_stage_seconds histogram")
+            for name, histogram in sorted(self.stages.items()):
+                histogram_lines("alen_stage_seconds", [("stage", name)], histogram)
+            lines.append("# HELP alen_request_seconds End-to-end request time by entry point and answer source.")
+            lines.append("# TYPE alen_request_seconds histogram")
+            for (kind, source), histogram in sorted(self.requests.items()):
+                histogram_lines("alen_request_seconds", [("kind", kind), ("source", source)], histogram)
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=METRICS_FILE):
+        if path.endswith(".prom"):
+            _atomic_write(path, self.prometheus_text())
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
+
+    def start_exporter(self, path=METRICS_FILE, interval=METRICS_INTERVAL):
+        """Export every `interval` seconds on a daemon thread; no-op without a path."""
+        if not path or self._exporter is not None:
+            return None
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.export(path)
+                except OSError as e:
+                    print(f"Metrics export failed: {e}")
+
+        self._exporter = threading.Thread(target=run, daemon=True, name="alen-metrics")
+        self._exporter.start()
+        return self._exporter
+
+    def stop_exporter(self):
+        self._stop.set()
+
+
+tracer = Tracer()
@@ -1,33 +1,163 @@
 # trainer.py
-from stable_baselines3 import PPO
-from stable_baselines3.common.env_checker import check_env
-from alen_env import ALENEnv
+import argparse
+import sys
+import time
+import numpy as np
+from alen_env import ALENEnv, EmptyDatasetError
+from interaction_store import INTERACTIONS_LOG_FILE
+from model_registry import MODEL_PATH, publish_model
+from action_catalog import build_catalog, load_catalog
+from compaction import COMPACT_DATASET_FILE, compact_interactions, fold, sample_weight
+from embedding_cache import normalize_text
+from bandit import BANDIT_MODEL_PATH, accuracy, fit_softmax
+from training_scheduler import SKIPPED_RETURNCODE
 import os
-import torch
 
-def train_alen_rl_model():
+def _prepare_dataset(compact):
+    if not compact:
+        return INTERACTIONS_LOG_FILE
+    # Train on unique (state, action) pairs, sampled by count and recency
+    stats = compact_interactions()
+    print(f"🗜 {stats['events']} interactions -> {stats['aggregates']} unique pairs")
+    return COMPACT_DATASET_FILE
+
+def train_alen_rl_model(n_envs=1, use_subprocess=False, total_timesteps=2000, compact=False):
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.env_checker import check_env
+    from stable_baselines3.common.env_util import make_vec_env
+    from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
     print("🔄 Initializing ALEN RL environment...")
-    env = ALENEnv(dataset_path="interaction_dataset.json")
+    dataset_path = _prepare_dataset(compact)
+    # Building the checked env first also fills the embedding cache, so the
+    # vectorized workers below only read vectors back from disk.
+    env = ALENEnv(dataset_path=dataset_path, precompute=True, compact=compact)
     check_env(env, warn=True)  # Optional sanity check
+    # Freeze one catalog for every worker and for the published model
+    actions = build_catalog(env.data, load_catalog())
+
+    vec_env_cls = SubprocVecEnv if use_subprocess and n_envs > 1 else DummyVecEnv
+    vec_env = make_vec_env(ALENEnv, n_envs=n_envs, vec_env_cls=vec_env_cls,
+                           env_kwargs={"dataset_path": dataset_path, "precompute": True,
+                                       "actions": actions, "compact": compact})
 
     # Automatically use GPU if available
     device = "cpu"
-    print(f"🧠 Training PPO model on device: {device}")
+    print(f"🧠 Training PPO model on device: {device} with {n_envs} env(s) ({vec_env_cls.__name__})")
 
-    model_path = "alen_rl_model.zip"
+    model_path = MODEL_PATH
     model = None
 
     if os.path.exists(model_path):
         print("📦 Loading existing model...")
-        model = PPO.load(model_path, env=env, device=device)
-    else:
+        model = PPO.load(model_path, device=device)
+        if model.action_space.n == vec_env.action_space.n:
+            model.set_env(vec_env)
+        else:
+            print(f"📐 {len(actions)} actions no longer fit the saved model ({model.action_space.n} outputs)")
+            model = None
+    if model is None:
         print("🆕 Creating new PPO model...")
-        model = PPO("MlpPolicy", env, verbose=1, device=device)
+        # Keep the rollout size near the single-env default of 2048 steps
+        model = PPO("MlpPolicy", vec_env, n_steps=max(2048 // n_envs, 64), verbose=1, device=device)
 
     print("🚀 Starting training...")
-    model.learn(total_timesteps=2000)
+    model.learn(total_timesteps=total_timesteps)
     print("💾 Saving model to alen_rl_model.zip")
-    model.save(model_path)
+    version = publish_model(model, actions, model_path)
+    print(f"📦 Published model version {version}")
+    vec_env.close()
+
+
+def _training_weights(env):
+    if env.compact:
+        return np.array([sample_weight(item) for item in env.data], dtype=np.float32)
+    # Raw log: a reply is logged once with reward 0 and again with its feedback, so judge
+    # each (state, action) pair by its net reward and drop every row of a disliked pair
+    totals = fold(env.data)
+    weights = np.ones(len(env.data), dtype=np.float32)
+    for i, item in enumerate(env.data):
+        pair = totals.get((normalize_text(item["state"]), item["action"]))
+        if pair is not None and pair["reward_sum"] < 0:
+            weights[i] = 0.0
+    return weights
+
+
+def _ppo_accuracy(states, targets, model_path=MODEL_PATH):
+    if not os.path.exists(model_path):
+        return None
+    try:
+        from stable_baselines3 import PPO
+    except ImportError:
+        return None
+    return accuracy(PPO.load(model_path, device="cpu"), states, targets)
+
+
+def train_bandit_model(compact=False, epochs=40, holdout=0.2, seed=0):
+    """Fit a softmax policy on the precomputed embeddings instead of running PPO.
+
+    Every episode in ALENEnv is one step, so the policy can be fitted
+    directly as weighted classification over the logged replies. A held-out
+    split is scored first (against the current PPO model too, if there is
+    one), then the policy is refitted on everything and published.
+    """
+    print("🔄 Preparing bandit training data...")
+    dataset_path = _prepare_dataset(compact)
+    env = ALENEnv(dataset_path=dataset_path, precompute=True, compact=compact)
+    actions = build_catalog(env.data, load_catalog())
+    states, targets = env.state_matrix, env.target_actions
+    weights = _training_weights(env)
+    if not weights.any():
+        raise EmptyDatasetError(f"every (state, action) pair in {dataset_path} is net-disliked")
+
+    order = np.random.default_rng(seed).permutation(len(states))
+    n_test = int(len(states) * holdout)
+    test, train = order[:n_test], order[n_test:]
+    test = test[weights[test] > 0]
+
+    start = time.perf_counter()
+    policy = fit_softmax(states[train], targets[train], len(actions), weights[train], epochs=epochs, seed=seed)
+    fit_seconds = time.perf_counter() - start
+
+    fitted = train[weights[train] > 0]
+    majority = np.bincount(targets[train], weights=weights[train], minlength=len(actions)).argmax()
+    report = {
+        "rows": len(states),
+        "actions": len(actions),
+        "fit_seconds": fit_seconds,
+        "majority_holdout": float((targets[test] == majority).mean()) if len(test) else 0.0,
+        "bandit_train": accuracy(policy, states[fitted], targets[fitted]),
+        "bandit_holdout": accuracy(policy, states[test], targets[test]),
+        "ppo_holdout": _ppo_accuracy(states[test], targets[test]),
+    }
+    print(f"📊 {report['rows']} rows, {report['actions']} actions, {len(test)} held out")
+    print(f"   fit time          {fit_seconds * 1000:8.1f} ms")
+    for label, key in (("majority baseline", "majority_holdout"), ("bandit (train)", "bandit_train"),
+                       ("bandit (holdout)", "bandit_holdout"), ("PPO (holdout)", "ppo_holdout")):
+        value = report[key]
+        print(f"   {label:17} {'n/a' if value is None else f'{value:8.1%}'}")
+
+    policy = fit_softmax(states, targets, len(actions), weights, epochs=epochs, seed=seed)
+    version = publish_model(policy, actions, BANDIT_MODEL_PATH)
+    print(f"📦 Published bandit model version {version} to {BANDIT_MODEL_PATH}")
+    return report
 
 if __name__ == "__main__":
-    train_alen_rl_model()
+    parser = argparse.ArgumentParser(description="Train the ALEN RL policy.")
+    parser.add_argument("--envs", type=int, default=1, help="number of parallel environments")
+    parser.add_argument("--subproc", action="store_true", help="run environments in worker processes")
+    parser.add_argument("--timesteps", type=int, default=2000)
+    parser.add_argument("--compact", action="store_true", help="compact the log first and train on unique pairs")
+    parser.add_argument("--mode", choices=["ppo", "bandit"], default="ppo",
+                        help="bandit fits a softmax policy in NumPy instead of running PPO")
+    parser.add_argument("--epochs", type=int, default=40, help="bandit mode: passes over the data")
+    args = parser.parse_args()
+    try:
+        if args.mode == "bandit":
+            train_bandit_model(compact=args.compact, epochs=args.epochs)
+        else:
+            train_alen_rl_model(n_envs=args.envs, use_subprocess=args.subproc, total_timesteps=args.timesteps,
+                                compact=args.compact)
+    except EmptyDatasetError as e:
+        print(f"⏭ Skipping training: {e}")
+        sys.exit(SKIPPED_RETURNCODE)
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+TRAINER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trainer.py")
+# Set ALEN_TRAIN_COMPACT=1 to train on the compacted (state, action) table instead of the raw log
+TRAIN_COMPACT = os.environ.get("ALEN_TRAIN_COMPACT") == "1"
+SKIPPED_RETURNCODE = 3  # trainer.py found nothing worth training on
+
+
+def _low_priority_kwargs():
+    if os.name == "nt":
+        return {"creationflags": getattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS", 0)}
+    return {"preexec_fn": lambda: os.nice(10)}
+
+
+class TrainingScheduler:
+    """Coalesces training requests and runs at most one trainer process at a time.
+
+    A request starts a debounce window; further requests inside it are folded
+    in. Requests arriving while a run is in progress produce exactly one
+    follow-up run once it finishes.
+    """
+
+    def __init__(self, debounce=10.0, max_delay=60.0, command=None, compact=TRAIN_COMPACT):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.command = command or [sys.executable, TRAINER_SCRIPT] + (["--compact"] if compact else [])
+        self._cond = threading.Condition()
+        self._pending_since = None
+        self._last_request = None
+        self._worker = None
+        self.running = False
+        self.runs = 0
+        self.last_returncode = None
+
+    def request(self):
+        with self._cond:
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            self._last_request = now
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_loop, daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def _wait_for_quiet(self):
+        # Called with the condition held; returns once the debounce window closes
+        while True:
+            now = time.monotonic()
+            quiet_at = self._last_request + self.debounce
+            deadline = min(quiet_at, self._pending_since + self.max_delay)
+            if now >= deadline:
+                return
+            self._cond.wait(deadline - now)
+
+    def _run_loop(self):
+        while True:
+            with self._cond:
+                if self._pending_since is None:
+                    self._worker = None
+                    return
+                self._wait_for_quiet()
+                self._pending_since = None
+                self.running = True
+            try:
+                self._train_once()
+            finally:
+                with self._cond:
+                    self.running = False
+
+    def _train_once(self):
+        print("⚙ Training RL model (background process)...")
+        try:
+            proc = subprocess.Popen(self.command, **_low_priority_kwargs())
+            self.last_returncode = proc.wait()
+        except Exception as e:
+            print(f"RL training failed: {e}")
+            return
+        self.runs += 1
+        if self.last_returncode == 0:
+            print("✅ Model trained and published")
+        elif self.last_returncode == SKIPPED_RETURNCODE:
+            print("⏭ Training skipped: every logged reply is net-disliked")
+        else:
+            print(f"RL training failed with exit code {self.last_returncode}")
+
+
+scheduler = TrainingScheduler()
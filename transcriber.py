@@ -0,0 +1,56 @@
+import threading
+import time
+import numpy as np
+
+SAMPLE_RATE = 16000  # Whisper expects 16 kHz mono float32
+
+
+class Transcriber:
+    """Keeps one Whisper model loaded and decodes recordings from memory."""
+
+    def __init__(self, model_name="small.en", decode_options=None):
+        self.model_name = model_name
+        self.decode_options = dict(decode_options or {})
+        self._model = None
+        self._lock = threading.Lock()
+        self.last_timings = {}
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import whisper
+                    self._model = whisper.load_model(self.model_name)
+        return self._model
+
+    def warm_up(self):
+        self._get_model()
+
+    def record(self, duration=3, device=None):
+        import sounddevice as sd
+        audio = sd.rec(int(SAMPLE_RATE * duration), samplerate=SAMPLE_RATE, channels=1,
+                       dtype="float32", device=device)
+        sd.wait()
+        return audio.reshape(-1)
+
+    def transcribe(self, audio):
+        model = self._get_model()
+        result = model.transcribe(np.ascontiguousarray(audio, dtype=np.float32), **self.decode_options)
+        return result["text"]
+
+    def listen(self, duration=3, device=None):
+        timings = {}
+        start = time.perf_counter()
+        self._get_model()
+        timings["load"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        audio = self.record(duration, device=device)
+        timings["record"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        text = self.transcribe(audio)
+        timings["decode"] = time.perf_counter() - start
+
+        self.last_timings = timings
+        return text
@@ -0,0 +1,81 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class UIDispatcher:
+    """Runs callables on the Tk main thread.
+
+    Calls made from other threads are queued and drained by a repeating
+    `window.after` callback; calls already on the main thread run inline.
+    """
+
+    def __init__(self, window, interval_ms=20, batch=50):
+        self.window = window
+        self.interval_ms = interval_ms
+        self.batch = batch
+        self._queue = queue.Queue()
+        self._main_thread = threading.current_thread()
+
+    def start(self):
+        self.window.after(self.interval_ms, self._drain)
+
+    def call(self, func, *args, **kwargs):
+        if threading.current_thread() is self._main_thread:
+            func(*args, **kwargs)
+        else:
+            self._queue.put((func, args, kwargs))
+
+    def _drain(self):
+        for _ in range(self.batch):
+            try:
+                func, args, kwargs = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                print(f"UI update failed: {e}")
+        self.window.after(self.interval_ms, self._drain)
+
+
+class BoundedExecutor:
+    """Fixed-size worker pool that refuses work once `max_pending` jobs are queued or running.
+
+    A job that raises has its traceback printed and is passed to
+    `on_error(exc)`, so failures are never dropped silently.
+    """
+
+    def __init__(self, max_workers=4, max_pending=8, on_error=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alen-worker")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.on_error = on_error
+
+    def submit(self, func, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._pool.submit(func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._slots.release()
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is None:
+            return
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+        if self.on_error is not None:
+            try:
+                self.on_error(exc)
+            except Exception as e:
+                print(f"Error handler failed: {e}")
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait)